@@ -12,6 +12,7 @@ from dataclasses import dataclass
 
 from .config_validator import ConfigValidator
 from src.exceptions import ConfigValidationError
+from src.utils.path_helper import get_builtin_ffmpeg_path
 
 
 @dataclass
@@ -95,6 +96,13 @@ class ConfigData:
     log_level: str
     log_file: Optional[str]
 
+    # FFmpeg 输入缓冲配置（按部署调优延迟与内存占用）
+    rtbufsize: str = ConfigValidator.DEFAULT_RTBUFSIZE  # gdigrab 实时缓冲区
+    network_buffer_size: int = ConfigValidator.DEFAULT_NETWORK_BUFFER_SIZE  # 网络流缓冲区（字节）
+    analyze_duration: int = ConfigValidator.DEFAULT_ANALYZE_DURATION  # 网络流分析时长（微秒）
+    probe_size: int = ConfigValidator.DEFAULT_PROBE_SIZE  # 网络流探测大小（字节）
+    read_chunk_size: int = ConfigValidator.DEFAULT_READ_CHUNK_SIZE  # 单次读取 FFmpeg 输出的最大字节数
+
 
 class ConfigParser:
     """配置文件解析器
@@ -189,6 +197,11 @@ class ConfigParser:
         config["ffmpeg"].setdefault("framerate", ConfigValidator.DEFAULT_FRAMERATE)
         config["ffmpeg"].setdefault("preset", ConfigValidator.DEFAULT_PRESET)
         config["ffmpeg"].setdefault("tune", ConfigValidator.DEFAULT_TUNE)
+        config["ffmpeg"].setdefault("rtbufsize", ConfigValidator.DEFAULT_RTBUFSIZE)
+        config["ffmpeg"].setdefault("network_buffer_size", ConfigValidator.DEFAULT_NETWORK_BUFFER_SIZE)
+        config["ffmpeg"].setdefault("analyze_duration", ConfigValidator.DEFAULT_ANALYZE_DURATION)
+        config["ffmpeg"].setdefault("probe_size", ConfigValidator.DEFAULT_PROBE_SIZE)
+        config["ffmpeg"].setdefault("read_chunk_size", ConfigValidator.DEFAULT_READ_CHUNK_SIZE)
 
         # 录制源配置默认值（必需）
         config.setdefault("source", {"type": "screen"})
@@ -258,18 +271,8 @@ class ConfigParser:
         Returns:
             Path: FFmpeg 可执行文件的绝对路径
         """
-        # Windows 平台
-        ffmpeg_name = "ffmpeg.exe"
-        ffmpeg_dir = self.project_root / "ffmpeg"
-        ffmpeg_path = ffmpeg_dir / ffmpeg_name
-
-        if not ffmpeg_path.exists():
-            raise FileNotFoundError(
-                f"找不到内置 FFmpeg: {ffmpeg_path.absolute()}\n"
-                f"请确保 FFmpeg 可执行文件位于 {ffmpeg_dir.absolute()} 目录下"
-            )
-
-        return ffmpeg_path
+        # 使用带缓存的公共实现，多次加载配置时不重复检查文件
+        return get_builtin_ffmpeg_path()
 
     def _convert_to_config_data(self, config: Dict[str, Any]) -> ConfigData:
         """将配置字典转换为 ConfigData 对象
@@ -295,6 +298,11 @@ class ConfigParser:
         framerate = ffmpeg_config["framerate"]
         preset = ffmpeg_config["preset"]
         tune = ffmpeg_config["tune"]
+        rtbufsize = ffmpeg_config["rtbufsize"]
+        network_buffer_size = ffmpeg_config["network_buffer_size"]
+        analyze_duration = ffmpeg_config["analyze_duration"]
+        probe_size = ffmpeg_config["probe_size"]
+        read_chunk_size = ffmpeg_config["read_chunk_size"]
 
         # 解析录制源配置
         source_config = self._parse_source_config(config["source"])
@@ -326,7 +334,12 @@ class ConfigParser:
             crash_window=crash_window,
             shutdown_timeout=shutdown_timeout,
             log_level=log_level,
-            log_file=log_file
+            log_file=log_file,
+            rtbufsize=rtbufsize,
+            network_buffer_size=network_buffer_size,
+            analyze_duration=analyze_duration,
+            probe_size=probe_size,
+            read_chunk_size=read_chunk_size
         )
 
     def _parse_source_config(self, source_dict: Dict[str, Any]) -> SourceConfig:
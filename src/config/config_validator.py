@@ -24,6 +24,12 @@ class ConfigValidator:
     DEFAULT_FRAMERATE = 30
     DEFAULT_PRESET = "ultrafast"
     DEFAULT_TUNE = "zerolatency"
+    DEFAULT_RTBUFSIZE = "100M"
+    DEFAULT_NETWORK_BUFFER_SIZE = 32768000  # 32MB
+    DEFAULT_ANALYZE_DURATION = 1000000  # 1 秒（微秒）
+    DEFAULT_PROBE_SIZE = 5000000  # 5MB
+    DEFAULT_READ_CHUNK_SIZE = 262144  # 256KB
+    MIN_READ_CHUNK_SIZE = 65536  # 64KB
     DEFAULT_CRASH_THRESHOLD = 3
     DEFAULT_CRASH_WINDOW = 60
     DEFAULT_SHUTDOWN_TIMEOUT = 30
@@ -197,6 +203,33 @@ class ConfigValidator:
                     f"支持的调优: {', '.join(self.VALID_TUNES)}"
                 )
 
+        # 验证实时缓冲区大小（如 "100M", "512K"）
+        if "rtbufsize" in ffmpeg:
+            rtbufsize = ffmpeg["rtbufsize"]
+            if not isinstance(rtbufsize, str) or not re.match(r'^\d+[KMkm]?$', rtbufsize):
+                raise ConfigValidationError(
+                    f"无效的实时缓冲区大小: {rtbufsize}，"
+                    f"正确格式示例: 100M, 512K"
+                )
+
+        # 验证网络流缓冲参数（正整数）
+        for key in ("network_buffer_size", "analyze_duration", "probe_size"):
+            if key in ffmpeg:
+                value = ffmpeg[key]
+                if not isinstance(value, int) or value <= 0:
+                    raise ConfigValidationError(
+                        f"{key} 必须是正整数，当前值: {value}"
+                    )
+
+        # 验证输出读取块大小（过小会导致每秒大量读取和调度开销）
+        if "read_chunk_size" in ffmpeg:
+            read_chunk_size = ffmpeg["read_chunk_size"]
+            if not isinstance(read_chunk_size, int) or read_chunk_size < self.MIN_READ_CHUNK_SIZE:
+                raise ConfigValidationError(
+                    f"read_chunk_size 必须是不小于 {self.MIN_READ_CHUNK_SIZE} 的整数，"
+                    f"当前值: {read_chunk_size}"
+                )
+
     def _validate_source_config(self, config: Dict[str, Any]) -> None:
         """验证录制源配置
 
@@ -8,10 +8,11 @@
 - 实例状态监控
 """
 
+import os
 import socket
 import logging
-from typing import Dict, Optional, List
-from threading import Lock
+from typing import Dict, Optional, List, Tuple
+from threading import Lock, Semaphore
 
 from .streaming_instance import StreamingInstance, InstanceStatus, InstanceInfo
 from src.config.config_manager import ConfigManager
@@ -28,7 +29,8 @@ class InstanceManager:
         self,
         config_manager: ConfigManager,
         base_port: int = 8765,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        max_concurrent_starts: Optional[int] = None
     ):
         """初始化实例管理器
 
@@ -36,19 +38,23 @@ class InstanceManager:
             config_manager: 配置管理器
             base_port: 起始端口号
             logger: 日志记录器
+            max_concurrent_starts: 同时初始化的实例数上限（默认 min(CPU 核数, 4)）
         """
         self.config_manager = config_manager
         self.base_port = base_port
         self.logger = logger or logging.getLogger(__name__)
 
         # 实例字典 {name: StreamingInstance}
+        # 写时复制：写操作在锁内发布新字典，读操作直接使用当前引用，无需加锁
         self._instances: Dict[str, StreamingInstance] = {}
-        self._lock = Lock()  # 线程锁
+        self._lock = Lock()  # 写锁
 
-        # 已分配的端口
-        self._used_ports: set = set()
+        # 启动准入信号量：限制同时处于初始化阶段的实例数量
+        if max_concurrent_starts is None:
+            max_concurrent_starts = min(os.cpu_count() or 1, 4)
+        self._start_semaphore = Semaphore(max_concurrent_starts)
 
-        self.logger.info(f"实例管理器初始化完成，起始端口: {base_port}")
+        self.logger.info("实例管理器初始化完成，起始端口: %s", base_port)
 
     def create_instance(self, config_name: str) -> StreamingInstance:
         """创建实例
@@ -74,14 +80,15 @@ class InstanceManager:
             # 分配端口
             port = self._allocate_port()
 
-            self.logger.info(f"创建实例: {config_name}, 端口: {port}")
+            self.logger.info("创建实例: %s, 端口: %s", config_name, port)
 
             # 创建实例
             instance = StreamingInstance(
                 name=config_name,
                 config=config,
                 port=port,
-                logger=self.logger
+                logger=self.logger,
+                start_semaphore=self._start_semaphore
             )
 
             # 注册状态变更回调
@@ -89,8 +96,10 @@ class InstanceManager:
                 lambda old, new: self._on_instance_status_change(config_name, old, new)
             )
 
-            # 保存实例
-            self._instances[config_name] = instance
+            # 保存实例（发布新字典）
+            instances = dict(self._instances)
+            instances[config_name] = instance
+            self._instances = instances
 
             return instance
 
@@ -114,14 +123,12 @@ class InstanceManager:
             if instance.status != InstanceStatus.STOPPED:
                 raise RuntimeError(f"实例正在运行，请先停止: {name}")
 
-            # 释放端口
-            if instance.port in self._used_ports:
-                self._used_ports.remove(instance.port)
+            # 移除实例（端口随实例一起释放，发布新字典）
+            instances = dict(self._instances)
+            del instances[name]
+            self._instances = instances
 
-            # 移除实例
-            del self._instances[name]
-
-            self.logger.info(f"实例已移除: {name}")
+            self.logger.info("实例已移除: %s", name)
 
     def start_instance(self, name: str) -> None:
         """启动实例
@@ -141,7 +148,7 @@ class InstanceManager:
         if instance.status != InstanceStatus.STOPPED:
             raise RuntimeError(f"实例未处于停止状态: {instance.status}")
 
-        self.logger.info(f"启动实例: {name}")
+        self.logger.info("启动实例: %s", name)
         instance.start()
 
     def stop_instance(self, name: str, timeout: float = 5.0) -> None:
@@ -159,7 +166,7 @@ class InstanceManager:
 
         instance = self._instances[name]
 
-        self.logger.info(f"停止实例: {name}")
+        self.logger.info("停止实例: %s", name)
         instance.stop(timeout=timeout)
 
     def restart_instance(self, name: str) -> None:
@@ -176,7 +183,7 @@ class InstanceManager:
 
         instance = self._instances[name]
 
-        self.logger.info(f"重启实例: {name}")
+        self.logger.info("重启实例: %s", name)
         instance.restart()
 
     def get_instance(self, name: str) -> Optional[StreamingInstance]:
@@ -220,11 +227,10 @@ class InstanceManager:
         Returns:
             Dict[str, InstanceStatus]: {实例名: 状态}
         """
-        with self._lock:
-            return {
-                name: instance.status
-                for name, instance in self._instances.items()
-            }
+        return {
+            name: instance.status
+            for name, instance in self._instances.items()
+        }
 
     def get_all_infos(self) -> List[InstanceInfo]:
         """获取所有实例信息
@@ -232,11 +238,29 @@ class InstanceManager:
         Returns:
             List[InstanceInfo]: 实例信息列表
         """
-        with self._lock:
-            return [
-                instance.get_info()
-                for instance in self._instances.values()
-            ]
+        return [
+            instance.get_info()
+            for instance in self._instances.values()
+        ]
+
+    def get_all_infos_lite(self) -> List[Tuple[str, str, int, Optional[float]]]:
+        """获取所有实例的轻量信息（适用于高频轮询）
+
+        不构造 InstanceInfo 对象，只返回易变字段
+
+        Returns:
+            List[Tuple[str, str, int, Optional[float]]]:
+                [(实例名, 状态值, 客户端数, 运行时间), ...]
+        """
+        return [
+            (
+                instance.name,
+                instance.status.value,
+                instance.get_client_count(),
+                instance.get_uptime()
+            )
+            for instance in self._instances.values()
+        ]
 
     def _allocate_port(self) -> int:
         """分配端口
@@ -247,14 +271,16 @@ class InstanceManager:
         Raises:
             RuntimeError: 无可用端口
         """
+        # 已分配的端口由现有实例推导（唯一数据源）
+        used_ports = {instance.port for instance in self._instances.values()}
+
         # 从起始端口开始查找可用端口
         port = self.base_port
 
         while port < 65536:
-            if port not in self._used_ports:
+            if port not in used_ports:
                 # 检查端口是否被系统占用
                 if self._is_port_available(port):
-                    self._used_ports.add(port)
                     return port
             port += 1
 
@@ -289,17 +315,11 @@ class InstanceManager:
             old_status: 旧状态
             new_status: 新状态
         """
+        # 注意：实例停止时不释放端口，允许重启时复用（端口随实例移除而释放）
         self.logger.info(
-            f"实例状态变更: {name} {old_status.value} -> {new_status.value}"
+            "实例状态变更: %s %s -> %s", name, old_status.value, new_status.value
         )
 
-        # 如果实例停止，释放端口
-        if new_status == InstanceStatus.STOPPED:
-            instance = self._instances.get(name)
-            if instance and instance.port in self._used_ports:
-                # 注意：这里不立即释放端口，允许重启时复用
-                pass
-
     def get_running_count(self) -> int:
         """获取运行中的实例数量
 
@@ -349,7 +369,7 @@ class InstanceManager:
                 try:
                     instance.stop(timeout=timeout)
                 except Exception as e:
-                    self.logger.error(f"停止实例失败 {name}: {e}")
+                    self.logger.error("停止实例失败 %s: %s", name, e)
 
     def get_instance_logs(self, name: str) -> List[str]:
         """获取实例日志
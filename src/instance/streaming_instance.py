@@ -11,6 +11,7 @@
 import asyncio
 import threading
 import logging
+import time
 from datetime import datetime
 from enum import Enum
 from typing import Optional, Callable, List, Dict, Any
@@ -21,6 +22,23 @@ from src.recorder.ffmpeg_recorder import FFmpegRecorder
 from src.streamer.ws_server import WebSocketStreamer
 
 
+# 日志时间戳缓存 [秒级时间戳, 格式化字符串]，同一秒内复用格式化结果
+_last_log_sec: List[Any] = [0, ""]
+
+
+def _log_timestamp() -> str:
+    """获取日志时间戳（按秒缓存 strftime 结果）
+
+    Returns:
+        str: 格式为 "%Y-%m-%d %H:%M:%S" 的时间戳
+    """
+    sec = int(time.time())
+    if sec != _last_log_sec[0]:
+        _last_log_sec[1] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec))
+        _last_log_sec[0] = sec
+    return _last_log_sec[1]
+
+
 class InstanceStatus(Enum):
     """实例状态枚举"""
     STOPPED = "stopped"
@@ -58,7 +76,8 @@ class StreamingInstance:
         name: str,
         config: ConfigData,
         port: int,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        start_semaphore: Optional[threading.Semaphore] = None
     ):
         """初始化推流实例
 
@@ -67,11 +86,13 @@ class StreamingInstance:
             config: 配置数据
             port: WebSocket 服务器端口
             logger: 日志记录器
+            start_semaphore: 启动准入信号量（限制同时初始化的实例数，可选）
         """
         self.name = name
         self.config = config
         self.port = port
         self.logger = logger or logging.getLogger(f"instance.{name}")
+        self._start_semaphore = start_semaphore
 
         # 实例状态
         self._status = InstanceStatus.STOPPED
@@ -84,6 +105,7 @@ class StreamingInstance:
         self._thread: Optional[threading.Thread] = None
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._stop_event = threading.Event()
+        self._async_stop_event: Optional[asyncio.Event] = None  # 事件循环内的停止信号
 
         # 组件
         self.recorder: Optional[FFmpegRecorder] = None
@@ -96,38 +118,55 @@ class StreamingInstance:
         # 状态变更回调
         self._status_callbacks: List[Callable[[InstanceStatus, InstanceStatus], None]] = []
 
+        # 实例生命周期内不变的信息（避免每次 get_info 重新读取配置）
+        self._static_info: Dict[str, Any] = {
+            "name": name,
+            "port": port,
+            "path": config.server_path,
+            "source_type": config.source.source.type,
+            "video_codec": config.video_codec,
+            "audio_codec": config.audio_codec,
+            "bitrate": config.bitrate,
+            "framerate": config.framerate,
+        }
+
     @property
     def status(self) -> InstanceStatus:
         """获取当前状态"""
         return self._status
 
-    def get_info(self) -> InstanceInfo:
-        """获取实例信息
+    def get_uptime(self) -> Optional[float]:
+        """获取运行时间
 
         Returns:
-            InstanceInfo: 实例信息
+            Optional[float]: 运行时间（秒），未运行返回 None
         """
-        uptime = None
         if self._start_time and self._status == InstanceStatus.RUNNING:
-            uptime = (datetime.now() - self._start_time).total_seconds()
+            return (datetime.now() - self._start_time).total_seconds()
+        return None
 
-        client_count = 0
+    def get_client_count(self) -> int:
+        """获取客户端连接数
+
+        Returns:
+            int: 客户端连接数
+        """
         if self.server:
-            client_count = self.server.client_manager.get_client_count()
+            return self.server.client_manager.get_client_count()
+        return 0
 
+    def get_info(self) -> InstanceInfo:
+        """获取实例信息
+
+        Returns:
+            InstanceInfo: 实例信息
+        """
         return InstanceInfo(
-            name=self.name,
             status=self._status,
-            port=self.port,
-            path=self.config.server_path,  # 添加路径信息
-            source_type=self.config.source.source.type,
-            client_count=client_count,
-            uptime=uptime,
+            client_count=self.get_client_count(),
+            uptime=self.get_uptime(),
             error=self._error_message,
-            video_codec=self.config.video_codec,
-            audio_codec=self.config.audio_codec,
-            bitrate=self.config.bitrate,
-            framerate=self.config.framerate
+            **self._static_info
         )
 
     def get_log(self) -> List[str]:
@@ -155,7 +194,7 @@ class StreamingInstance:
         if self._status != InstanceStatus.STOPPED:
             raise RuntimeError(f"实例未处于停止状态: {self._status}")
 
-        self.logger.info(f"启动实例: {self.name}")
+        self.logger.info("启动实例: %s", self.name)
 
         # 设置状态为启动中
         self._set_status(InstanceStatus.STARTING)
@@ -174,12 +213,23 @@ class StreamingInstance:
         # 创建新的事件循环
         self._loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self._loop)
+        self._async_stop_event = asyncio.Event()
 
         # 运行启动协程
         try:
+            # 启动、等待停止信号、释放资源均在同一协程中完成
             self._loop.run_until_complete(self._start_async())
+
+            # 取消剩余任务（如停止过程中产生的延迟关闭任务），等待其结束后再关闭事件循环
+            pending = asyncio.all_tasks(self._loop)
+            if pending:
+                for task in pending:
+                    task.cancel()
+                self._loop.run_until_complete(
+                    asyncio.gather(*pending, return_exceptions=True)
+                )
         except Exception as e:
-            self.logger.error(f"实例运行异常: {e}", exc_info=True)
+            self.logger.error("实例运行异常: %s", e, exc_info=True)
             self._error_message = str(e)
             self._set_status(InstanceStatus.ERROR)
         finally:
@@ -187,23 +237,38 @@ class StreamingInstance:
             self._loop.close()
 
     async def _start_async(self):
-        """异步启动实例"""
+        """异步启动实例，运行至收到停止信号后释放资源
+
+        停止流程在本协程中执行（而非由 stop() 另行调度），
+        保证事件循环关闭前服务器和录制器一定已经停止
+        """
         try:
             self._log(f"[INFO] 启动推流实例: {self.name}")
 
-            # 创建录制器
-            self._log(f"[INFO] 初始化 FFmpeg 录制器...")
-            self.recorder = FFmpegRecorder(self.config, self.logger)
+            # 限制同时初始化的实例数量（批量启动时避免线程/进程争抢资源）
+            # 等待期间收到停止信号则放弃启动，不再创建服务器
+            if self._start_semaphore is not None:
+                if not await asyncio.to_thread(self._acquire_start_slot):
+                    self._log(f"[INFO] 启动前已收到停止信号，取消启动: {self.name}")
+                    return
+
+            try:
+                # 创建录制器
+                self._log(f"[INFO] 初始化 FFmpeg 录制器...")
+                self.recorder = FFmpegRecorder(self.config, self.logger)
 
-            # 修改配置的端口为分配的端口
-            self.config.server_port = self.port
+                # 修改配置的端口为分配的端口
+                self.config.server_port = self.port
 
-            # 创建 WebSocket 服务器
-            self._log(f"[INFO] 初始化 WebSocket 服务器，端口: {self.port}")
-            self.server = WebSocketStreamer(self.config, self.recorder, self.logger)
+                # 创建 WebSocket 服务器
+                self._log(f"[INFO] 初始化 WebSocket 服务器，端口: {self.port}")
+                self.server = WebSocketStreamer(self.config, self.recorder, self.logger)
 
-            # 启动服务器
-            await self.server.start()
+                # 启动服务器
+                await self.server.start()
+            finally:
+                if self._start_semaphore is not None:
+                    self._start_semaphore.release()
 
             # 记录启动时间
             self._start_time = datetime.now()
@@ -212,16 +277,39 @@ class StreamingInstance:
             self._set_status(InstanceStatus.RUNNING)
             self._log(f"[INFO] 实例启动成功: {self.name}")
 
-            # 等待停止信号
-            while not self._stop_event.is_set():
-                await asyncio.sleep(0.5)
+            # 等待停止信号（stop() 可能在事件创建前已被调用）
+            if self._stop_event.is_set():
+                self._async_stop_event.set()
+            await self._async_stop_event.wait()
 
         except Exception as e:
-            self.logger.error(f"启动失败: {e}", exc_info=True)
+            self.logger.error("启动失败: %s", e, exc_info=True)
             self._error_message = str(e)
             self._set_status(InstanceStatus.ERROR)
             self._log(f"[ERROR] 启动失败: {e}")
 
+        finally:
+            # 正常停止或启动失败，都释放已创建的服务器和录制器
+            await self._stop_async()
+
+    def _acquire_start_slot(self, poll_interval: float = 0.1) -> bool:
+        """获取启动名额，等待期间定期检查停止信号（在线程池中执行）
+
+        Args:
+            poll_interval: 检查停止信号的间隔（秒）
+
+        Returns:
+            bool: True 表示已获取名额；False 表示已收到停止信号（未持有名额）
+        """
+        while not self._stop_event.is_set():
+            if self._start_semaphore.acquire(timeout=poll_interval):
+                # 获取名额的同时可能已收到停止信号，此时归还名额
+                if self._stop_event.is_set():
+                    self._start_semaphore.release()
+                    return False
+                return True
+        return False
+
     def stop(self, timeout: float = 5.0) -> None:
         """停止实例
 
@@ -231,27 +319,28 @@ class StreamingInstance:
         if self._status == InstanceStatus.STOPPED:
             return
 
-        self.logger.info(f"停止实例: {self.name}")
+        self.logger.info("停止实例: %s", self.name)
         self._set_status(InstanceStatus.STOPPING)
 
-        # 发送停止信号
+        # 发送停止信号（事件循环中的 _start_async 收到后自行释放资源并退出）
         self._stop_event.set()
 
-        # 等待线程结束
+        loop = self._loop
+        async_stop_event = self._async_stop_event
+        if loop and async_stop_event is not None:
+            try:
+                loop.call_soon_threadsafe(async_stop_event.set)
+            except RuntimeError:
+                # 事件循环已关闭（实例线程已退出），无需唤醒
+                pass
+
+        # 等待线程结束（停止流程在线程内执行完毕后退出）
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=timeout)
 
             # 如果超时，强制停止
             if self._thread.is_alive():
-                self.logger.warning(f"实例停止超时，强制停止: {self.name}")
-
-        # 清理资源
-        if self._loop and not self._loop.is_closed():
-            # 如果事件循环还在运行，调度停止协程
-            try:
-                asyncio.run_coroutine_threadsafe(self._stop_async(), self._loop)
-            except Exception as e:
-                self.logger.error(f"停止协程失败: {e}")
+                self.logger.warning("实例停止超时，强制停止: %s", self.name)
 
         # 设置状态为已停止
         self._set_status(InstanceStatus.STOPPED)
@@ -265,11 +354,11 @@ class StreamingInstance:
             if self.recorder:
                 self.recorder.stop()
         except Exception as e:
-            self.logger.error(f"停止异常: {e}")
+            self.logger.error("停止异常: %s", e)
 
     def restart(self) -> None:
         """重启实例"""
-        self.logger.info(f"重启实例: {self.name}")
+        self.logger.info("重启实例: %s", self.name)
 
         # 停止
         self.stop()
@@ -295,7 +384,7 @@ class StreamingInstance:
             try:
                 callback(old_status, new_status)
             except Exception as e:
-                self.logger.error(f"状态回调失败: {e}")
+                self.logger.error("状态回调失败: %s", e)
 
     def _log(self, message: str):
         """记录日志
@@ -303,8 +392,7 @@ class StreamingInstance:
         Args:
             message: 日志消息
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_line = f"[{timestamp}] {message}"
+        log_line = f"[{_log_timestamp()}] {message}"
 
         # 添加到日志列表
         self._logs.append(log_line)
@@ -10,20 +10,16 @@ import asyncio
 import signal
 import platform
 from pathlib import Path
+from typing import Optional
 
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config.config_parser import ConfigParser
-from src.recorder.ffmpeg_recorder import FFmpegRecorder
-from src.recorder.window_helper import WindowHelper
-from src.streamer.ws_server import WebSocketStreamer
 from src.utils.logger import setup_logger
 
-# 多实例支持
-from src.config.config_manager import ConfigManager
-from src.instance.instance_manager import InstanceManager
-from src.tray.tray_app import TrayApp
+# 关闭信号事件（在 main() 中创建，由信号处理器设置）
+_shutdown_event: Optional[asyncio.Event] = None
 
 
 def safe_print(*args, **kwargs):
@@ -31,46 +27,46 @@ def safe_print(*args, **kwargs):
     try:
         print(*args, **kwargs)
     except UnicodeEncodeError:
-        # 如果编码失败，使用 errors='ignore' 参数重试
-        import io
-        from contextlib import redirect_stdout
-
-        # 捕获输出并使用替代字符
-        output = io.StringIO()
-        with redirect_stdout(output):
-            print(*args, **kwargs)
-
-        # 尝试使用替代字符编码
-        try:
-            text = output.getvalue()
-            # 将 emoji 和其他特殊字符替换为 ASCII 替代
-            text = text.encode('gbk', errors='replace').decode('gbk')
-            print(text, **kwargs)
-        except:
-            # 如果还是失败，使用最简单的方式
-            print("信息输出（编码错误）", **kwargs)
-
-
-async def main():
-    """主函数"""
-
-    # 0. 设置控制台编码（Windows 兼容）
+        # 控制台编码无法表示的字符（如 emoji）替换为 '?'
+        encoding = getattr(sys.stdout, 'encoding', None) or 'ascii'
+        text = " ".join(str(arg) for arg in args)
+        print(text.encode(encoding, errors='replace').decode(encoding), **kwargs)
+
+
+def install_uvloop() -> bool:
+    """安装 uvloop 事件循环策略（可选依赖，未安装或不支持的平台保持默认事件循环）
+
+    必须在创建任何事件循环之前调用，之后 asyncio.run()/new_event_loop() 都会使用 uvloop
+
+    Returns:
+        bool: 是否已安装 uvloop
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    uvloop.install()
+    return True
+
+
+async def main(args: argparse.Namespace):
+    """主函数
+
+    Args:
+        args: 已解析的命令行参数
+    """
+
+    # 0. 设置控制台编码（Windows 兼容，原地修改，不重新包装流）
     if platform.system() == "Windows":
-        import io
-        # 尝试设置 UTF-8 编码输出
-        try:
-            sys.stdout = io.TextIOWrapper(
-                sys.stdout.buffer, encoding='utf-8', errors='replace'
-            )
-            sys.stderr = io.TextIOWrapper(
-                sys.stderr.buffer, encoding='utf-8', errors='replace'
-            )
-        except Exception:
-            # 如果设置失败，继续使用默认编码
-            pass
-
-    # 1. 解析命令行参数
-    args = parse_args()
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.reconfigure(encoding='utf-8', errors='replace')
+            except (AttributeError, ValueError):
+                # 流已被替换或不支持重新配置，继续使用默认编码
+                pass
+
+    # 1. 读取配置文件路径（参数已在 __main__ 中解析）
     config_path = args.config
 
     # 2. 加载并验证配置
@@ -89,10 +85,15 @@ async def main():
     logger.info("WebSocket Screen Streamer 启动")
     logger.info("=" * 60)
 
+    from src.recorder.ffmpeg_recorder import FFmpegRecorder
+    from src.streamer.ws_server import WebSocketStreamer
+
     # 4. 创建窗口助手（窗口录制时需要）
     window_helper = None
     source_type = config.source.source.type
     if source_type in ["window", "window_bg", "window_region"]:
+        from src.recorder.window_helper import WindowHelper
+
         logger.info("初始化窗口助手...")
         window_helper = WindowHelper(logger)
 
@@ -109,13 +110,13 @@ async def main():
     server = WebSocketStreamer(config, recorder, logger)
 
     # 7. 设置信号处理（仅在 Unix 系统上）
+    global _shutdown_event
+    _shutdown_event = asyncio.Event()
+
     if platform.system() != "Windows":
         loop = asyncio.get_running_loop()
         for sig in (signal.SIGINT, signal.SIGTERM):
-            loop.add_signal_handler(
-                sig,
-                lambda: asyncio.create_task(shutdown(server, logger))
-            )
+            loop.add_signal_handler(sig, _shutdown_event.set)
     else:
         # Windows 上使用传统的信号处理
         # KeyboardInterrupt 会被 __main__ 中的 try-except 捕获
@@ -138,6 +139,7 @@ async def main():
 
         # 9. 保持运行，等待信号
         await wait_for_shutdown()
+        logger.info("收到关闭信号，正在优雅退出...")
 
     except Exception as e:
         logger.error(f"❌ 服务器运行异常: {e}", exc_info=True)
@@ -215,26 +217,8 @@ def parse_args() -> argparse.Namespace:
 
 
 async def wait_for_shutdown():
-    """等待关闭信号"""
-    # 创建一个永远不会完成的 Future
-    future = asyncio.Future()
-    await future
-
-
-async def shutdown(server: WebSocketStreamer, logger):
-    """关闭处理
-
-    Args:
-        server: WebSocket 服务器
-        logger: 日志记录器
-    """
-    logger.info("\n收到关闭信号，正在优雅退出...")
-
-    # 停止服务器
-    await server.stop()
-
-    # 退出程序
-    sys.exit(0)
+    """等待关闭信号（由信号处理器设置 _shutdown_event）"""
+    await _shutdown_event.wait()
 
 
 def list_windows_command():
@@ -244,9 +228,8 @@ def list_windows_command():
     print("\n=== 列出所有可见窗口 ===\n")
 
     try:
-        from recorder.window_helper import WindowHelper
-        from utils.logger import setup_logger
-        from config.config_parser import ConfigData, SourceConfig, ScreenSourceConfig
+        from src.recorder.window_helper import WindowHelper
+        from src.config.config_parser import ConfigData, SourceConfig, ScreenSourceConfig
 
         # 创建临时配置用于日志
         temp_config = ConfigData(
@@ -272,13 +255,11 @@ def list_windows_command():
 
         windows = helper.list_all_windows()
 
-        print(f"{'HWND':<12} | {'窗口标题'}")
-        print("-" * 80)
-
-        for hwnd, title in windows:
-            print(f"{hwnd:<12} | {title}")
-
-        print(f"\n共 {len(windows)} 个窗口\n")
+        # 一次性拼接后写出，避免逐行 print
+        lines = [f"{'HWND':<12} | {'窗口标题'}", "-" * 80]
+        lines.extend(f"{hwnd:<12} | {title}" for hwnd, title in windows)
+        lines.append(f"\n共 {len(windows)} 个窗口\n")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     except Exception as e:
         print(f"❌ 列出窗口失败: {e}")
@@ -304,8 +285,13 @@ def run_tray_mode(config_dir: str, hidden: bool = False) -> None:
     logger = logging.getLogger(__name__)
 
     try:
-        # 1. 先在主线程创建 QApplication（PyQt5 必须在主线程）
+        # 多实例支持（仅托盘模式需要，延迟导入避免单实例模式加载 Qt）
         from PyQt5.QtWidgets import QApplication
+        from src.config.config_manager import ConfigManager
+        from src.instance.instance_manager import InstanceManager
+        from src.tray.tray_app import TrayApp
+
+        # 1. 先在主线程创建 QApplication（PyQt5 必须在主线程）
         app = QApplication.instance()
         if app is None:
             app = QApplication([])
@@ -324,13 +310,8 @@ def run_tray_mode(config_dir: str, hidden: bool = False) -> None:
         # 5. 创建托盘应用
         tray_app = TrayApp(config_manager, instance_manager, logger)
 
-        # 6. 在单独线程中运行托盘图标（因为 tray_app.run() 是阻塞的）
-        import threading
-        tray_thread = threading.Thread(
-            target=tray_app.run,
-            daemon=True
-        )
-        tray_thread.start()
+        # 6. 显示托盘图标（与主窗口共用 Qt 事件循环）
+        tray_app.run()
         safe_print(f"✅ 托盘图标已启动")
 
         # 7. 如果不隐藏，显示主窗口
@@ -341,8 +322,7 @@ def run_tray_mode(config_dir: str, hidden: bool = False) -> None:
         safe_print(f"💡 右键托盘图标查看菜单")
         safe_print(f"💡 双击托盘图标显示/隐藏主窗口")
 
-        # 8. 在主线程运行 Qt 事件循环（阻塞）
-        # 这样 PyQt5 就在主线程中运行了
+        # 8. 在主线程运行 Qt 事件循环（阻塞，同时驱动托盘图标和主窗口）
         app.exec_()
 
         # 9. Qt 事件循环结束后，停止托盘应用
@@ -351,7 +331,7 @@ def run_tray_mode(config_dir: str, hidden: bool = False) -> None:
 
     except ImportError as e:
         safe_print(f"❌ 缺少依赖库: {e}")
-        safe_print(f"💡 请运行: pip install pystray Pillow PyQt5")
+        safe_print(f"💡 请运行: pip install PyQt5")
         sys.exit(1)
     except Exception as e:
         safe_print(f"❌ 托盘应用启动失败: {e}")
@@ -363,6 +343,9 @@ if __name__ == "__main__":
     # 解析参数
     args = parse_args()
 
+    # 可用时使用 uvloop（加速 WebSocket/HTTP 套接字读写；Windows 不支持，保持默认）
+    install_uvloop()
+
     # 列出窗口的辅助命令
     if args.list_windows:
         list_windows_command()
@@ -375,7 +358,7 @@ if __name__ == "__main__":
 
     # 单实例模式（原有逻辑）
     try:
-        asyncio.run(main())
+        asyncio.run(main(args))
     except KeyboardInterrupt:
         print("\n用户中断，程序退出")
         sys.exit(0)
@@ -4,8 +4,9 @@
 监控子进程的健康状态，实现崩溃检测和重启策略
 """
 
-from datetime import datetime, timedelta
-from typing import List
+import time
+from collections import deque
+from typing import Deque
 import logging
 
 
@@ -29,7 +30,8 @@ class HealthMonitor:
         self.threshold = threshold
         self.window = window
         self.logger = logger
-        self.crash_history: List[datetime] = []
+        # 崩溃时间戳（time.monotonic()），只需保留最近 threshold 条即可判断是否超阈值
+        self.crash_history: Deque[float] = deque(maxlen=threshold)
 
         self.logger.debug(
             f"健康监控器已初始化: 阈值={threshold}次, 时间窗口={window}秒"
@@ -37,8 +39,7 @@ class HealthMonitor:
 
     def record_crash(self) -> None:
         """记录一次崩溃"""
-        now = datetime.now()
-        self.crash_history.append(now)
+        self.crash_history.append(time.monotonic())
 
         # 清理超出时间窗口的记录
         self._cleanup_old_crashes()
@@ -93,14 +94,12 @@ class HealthMonitor:
         if not self.crash_history:
             return
 
-        cutoff = datetime.now() - timedelta(seconds=self.window)
+        cutoff = time.monotonic() - self.window
         original_count = len(self.crash_history)
 
-        # 只保留时间窗口内的记录
-        self.crash_history = [
-            crash_time for crash_time in self.crash_history
-            if crash_time > cutoff
-        ]
+        # 记录按时间顺序追加，从左侧弹出超出时间窗口的记录
+        while self.crash_history and self.crash_history[0] <= cutoff:
+            self.crash_history.popleft()
 
         cleaned_count = original_count - len(self.crash_history)
         if cleaned_count > 0:
@@ -4,10 +4,12 @@
 管理任意子进程的生命周期，支持策略注入
 """
 
+import queue
 import subprocess
 import threading
-from typing import Callable, List, Optional
-from datetime import datetime
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
 
 from src.exceptions import ProcessManagerError
 import logging
@@ -16,11 +18,13 @@ import logging
 class ProcessState:
     """进程状态对象"""
 
+    __slots__ = ("is_running", "pid", "start_time", "client_count")
+
     def __init__(
         self,
         is_running: bool,
         pid: Optional[int],
-        start_time: Optional[datetime],
+        start_time: Optional[float],
         client_count: int = 0
     ):
         self.is_running = is_running
@@ -29,6 +33,22 @@ class ProcessState:
         self.client_count = client_count
 
 
+# 读取线程单次读取的最大字节数（与常见管道缓冲区大小一致，一次即可读空管道）
+_READ_CHUNK_SIZE = 1 << 18
+
+# 输出队列最多缓存的数据块数量（超出后读取线程阻塞，由管道反压 FFmpeg）
+_OUTPUT_QUEUE_SIZE = 256
+
+# stderr 最多保留的最近数据块数量（旧数据自动丢弃）
+_STDERR_TAIL_SIZE = 16
+
+# 子进程管道缓冲区大小（1MB，减少大帧读取时的系统调用次数）
+_PIPE_BUFFER_SIZE = 1 << 20
+
+# Windows 上不为子进程创建控制台窗口（其他平台无此常量，取 0）
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
 class ProcessManager:
     """通用子进程管理器
 
@@ -53,11 +73,17 @@ class ProcessManager:
         self.cmd_builder = cmd_builder
         self.logger = logger
         self.process: Optional[subprocess.Popen] = None
-        self.start_time: Optional[datetime] = None
+        self.start_time: Optional[float] = None  # time.monotonic() 时间戳
 
-        # 读取线程（用于异步读取 stdout）
+        # 读取线程（后台持续读取 stdout，写入有界队列）
         self._read_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        self._stdout_queue: "queue.Queue[bytes]" = queue.Queue(maxsize=_OUTPUT_QUEUE_SIZE)
+        self._pending = b''  # 上次读取未取完的剩余数据
+
+        # stderr 读取线程（持续排空管道，避免 FFmpeg 写满管道后阻塞）
+        self._stderr_thread: Optional[threading.Thread] = None
+        self._stderr_tail: Deque[bytes] = deque(maxlen=_STDERR_TAIL_SIZE)
 
     def start(self) -> ProcessState:
         """启动子进程
@@ -74,7 +100,7 @@ class ProcessManager:
 
         # 获取命令
         cmd = self.cmd_builder()
-        self.logger.info(f"启动进程: {' '.join(cmd)}")
+        self.logger.info("启动进程: %s", cmd)
 
         try:
             # 启动进程
@@ -82,9 +108,15 @@ class ProcessManager:
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                bufsize=0  # 无缓冲，实时输出
+                bufsize=_PIPE_BUFFER_SIZE,
+                creationflags=_CREATION_FLAGS,
+                # Python 创建的文件描述符/句柄默认不可继承（PEP 446），无需逐个关闭
+                close_fds=False
             )
-            self.start_time = datetime.now()
+            self.start_time = time.monotonic()
+
+            # 启动 stdout/stderr 读取线程
+            self._start_read_thread()
 
             self.logger.info(
                 f"进程已启动，PID: {self.process.pid}"
@@ -115,9 +147,16 @@ class ProcessManager:
             return True
 
         pid = self.process.pid
-        self.logger.info(f"正在停止进程 (PID: {pid})...")
 
         try:
+            # 进程已自行退出：无需终止和等待，只清理资源
+            returncode = self.process.poll()
+            if returncode is not None:
+                self.logger.info(f"进程已退出 (PID: {pid}, 退出码: {returncode})，清理资源")
+                return True
+
+            self.logger.info(f"正在停止进程 (PID: {pid})...")
+
             # 1. 尝试优雅终止（发送 SIGTERM）
             self.process.terminate()
 
@@ -144,6 +183,9 @@ class ProcessManager:
             return False
 
         finally:
+            # 停止读取线程（进程退出后 stdout 到达 EOF）
+            self._stop_read_thread()
+
             # 清理资源
             self.process = None
             self.start_time = None
@@ -182,79 +224,194 @@ class ProcessManager:
             return False
         return self.process.poll() is None
 
-    def read_output(self, size: int = 4096) -> bytes:
-        """读取进程输出
+    def read_output(self, size: int = 4096, timeout: float = 0) -> bytes:
+        """读取进程输出（默认非阻塞）
+
+        从读取线程填充的队列中取出已到达的数据
 
         Args:
-            size: 读取字节数
+            size: 最多读取的字节数（负数表示读取全部已到达的数据）
+            timeout: 暂无数据时最多等待的秒数（0 表示不等待）
 
         Returns:
-            bytes: 输出数据，如果进程未运行返回空字节
+            bytes: 输出数据，暂无数据或进程未运行返回空字节
         """
-        if not self.process or not self.process.stdout:
+        limit = size if size >= 0 else float('inf')
+        parts = []
+        total = 0
+
+        # 先取上次剩余的数据
+        if self._pending:
+            chunk = self._pending
+            if len(chunk) > limit:
+                self._pending = chunk[limit:]
+                chunk = chunk[:limit]
+            else:
+                self._pending = b''
+            parts.append(chunk)
+            total += len(chunk)
+
+        # 再从队列中取出已到达的数据块（尚无数据时按 timeout 等待第一块）
+        while total < limit:
+            try:
+                if total == 0 and timeout > 0:
+                    chunk = self._stdout_queue.get(timeout=timeout)
+                else:
+                    chunk = self._stdout_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            remaining = limit - total
+            if len(chunk) > remaining:
+                self._pending = chunk[remaining:]
+                chunk = chunk[:remaining]
+
+            parts.append(chunk)
+            total += len(chunk)
+
+        if not parts:
             return b''
+        return parts[0] if len(parts) == 1 else b''.join(parts)
 
-        try:
-            # 使用非阻塞读取
-            import os
+    def read_output_into(self, buffer, timeout: float = 0) -> int:
+        """读取进程输出到调用方提供的缓冲区（默认非阻塞，不分配新的 bytes）
 
-            # 检查文件描述符是否有数据可读
-            fd = self.process.stdout.fileno()
+        Args:
+            buffer: 可写的字节缓冲区（bytearray 或 memoryview）
+            timeout: 暂无数据时最多等待的秒数（0 表示不等待）
 
-            # 尝试非阻塞读取
+        Returns:
+            int: 写入的字节数，暂无数据返回 0
+        """
+        out = memoryview(buffer)
+        size = len(out)
+        written = 0
+
+        # 先写入上次剩余的数据
+        if self._pending:
+            take = min(len(self._pending), size)
+            out[:take] = self._pending[:take]
+            self._pending = self._pending[take:]
+            written = take
+
+        # 再从队列中取出已到达的数据块（尚无数据时按 timeout 等待第一块）
+        while written < size:
             try:
-                # 使用 os.read 进行非阻塞读取
-                data = os.read(fd, size)
-                return data if data else b''
-            except BlockingIOError:
-                # 没有数据可读
-                return b''
-            except OSError:
-                # Windows 管道不支持非阻塞，使用普通读取
-                # 先检查是否有数据（使用 peek）
-                if hasattr(self.process.stdout, 'peek'):
-                    available = self.process.stdout.peek(1)
-                    if not available:
-                        return b''
-
-                # 使用 read1 读取（最多读取 size 字节，不会阻塞等待填满缓冲区）
-                data = self.process.stdout.read1(size)
-                return data if data else b''
+                if written == 0 and timeout > 0:
+                    chunk = self._stdout_queue.get(timeout=timeout)
+                else:
+                    chunk = self._stdout_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            take = min(len(chunk), size - written)
+            out[written:written + take] = memoryview(chunk)[:take]
+            if take < len(chunk):
+                self._pending = chunk[take:]
+            written += take
+
+        return written
+
+    def _start_read_thread(self) -> None:
+        """启动 stdout/stderr 读取线程"""
+        self._stop_event.clear()
+        self._pending = b''
+        self._stdout_queue = queue.Queue(maxsize=_OUTPUT_QUEUE_SIZE)
+        self._stderr_tail = deque(maxlen=_STDERR_TAIL_SIZE)
+
+        self._read_thread = threading.Thread(
+            target=self._pump_stdout,
+            args=(self.process.stdout, self._stdout_queue),
+            name=f"ProcessReader-{self.process.pid}",
+            daemon=True
+        )
+        self._read_thread.start()
 
-        except Exception as e:
-            self.logger.error(f"读取进程输出失败: {e}")
-            return b''
+        self._stderr_thread = threading.Thread(
+            target=self._pump_stderr,
+            args=(self.process.stderr, self._stderr_tail),
+            name=f"ProcessStderr-{self.process.pid}",
+            daemon=True
+        )
+        self._stderr_thread.start()
 
-    def read_stderr(self) -> str:
-        """读取进程错误输出
+    def _stop_read_thread(self, timeout: float = 2.0) -> None:
+        """停止 stdout/stderr 读取线程
 
-        Returns:
-            str: 错误输出
+        Args:
+            timeout: 等待线程退出的超时时间（秒）
         """
-        if not self.process or not self.process.stderr:
-            return ""
+        self._stop_event.set()
+
+        for thread in (self._read_thread, self._stderr_thread):
+            if thread and thread.is_alive():
+                thread.join(timeout=timeout)
 
+        self._read_thread = None
+        self._stderr_thread = None
+
+    def _pump_stdout(self, stdout, output_queue: "queue.Queue[bytes]") -> None:
+        """读取线程主循环：阻塞读取 stdout 并写入队列
+
+        Args:
+            stdout: 子进程 stdout 管道
+            output_queue: 输出数据队列
+        """
         try:
-            # 非阻塞读取错误输出
-            import os
+            while not self._stop_event.is_set():
+                chunk = stdout.read1(_READ_CHUNK_SIZE)
+                if not chunk:
+                    break  # EOF，进程已退出
+
+                # 队列满时等待消费，同时响应停止信号
+                while not self._stop_event.is_set():
+                    try:
+                        output_queue.put(chunk, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+        except (OSError, ValueError) as e:
+            # 管道已关闭
+            if not self._stop_event.is_set():
+                self.logger.error(f"读取进程输出失败: {e}")
+
+    def _pump_stderr(self, stderr, tail: Deque[bytes]) -> None:
+        """stderr 读取线程主循环：持续排空 stderr，只保留最近的输出
 
-            fd = self.process.stderr.fileno()
+        Args:
+            stderr: 子进程 stderr 管道
+            tail: 最近输出的有界缓存
+        """
+        try:
+            while True:
+                chunk = stderr.read1(4096)
+                if not chunk:
+                    break  # EOF，进程已退出
+                tail.append(chunk)
 
-            try:
-                # 使用 os.read 进行非阻塞读取
-                data = os.read(fd, 4096)
-                return data.decode('utf-8', errors='ignore') if data else ""
-            except BlockingIOError:
-                # 没有数据可读
-                return ""
-            except OSError:
-                # Windows 管道不支持非阻塞，使用普通读取
-                data = self.process.stderr.read(4096)
-                return data.decode('utf-8', errors='ignore') if data else ""
+        except (OSError, ValueError) as e:
+            # 管道已关闭
+            if not self._stop_event.is_set():
+                self.logger.error(f"读取进程错误输出失败: {e}")
 
-        except Exception as e:
-            self.logger.error(f"读取进程错误输出失败: {e}")
+    def read_stderr(self) -> str:
+        """读取进程最近的错误输出（非阻塞）
+
+        返回上次调用以来读取线程缓存的 stderr 内容（只保留最近部分）
+
+        Returns:
+            str: 错误输出
+        """
+        tail = self._stderr_tail
+        chunks = []
+
+        while tail:
+            chunks.append(tail.popleft())
+
+        if not chunks:
             return ""
+        return b''.join(chunks).decode('utf-8', errors='ignore')
 
     def get_return_code(self) -> Optional[int]:
         """获取进程退出码
@@ -6,15 +6,17 @@
 
 from abc import ABC, abstractmethod
 from typing import Optional
-from datetime import datetime
 from dataclasses import dataclass
 
 
 @dataclass
 class RecorderState:
     """录制器状态（通用）"""
+    # 手动声明 __slots__（字段均无默认值；dataclass(slots=True) 需要 Python 3.10+）
+    __slots__ = ("is_running", "start_time", "client_count")
+
     is_running: bool
-    start_time: Optional[datetime]
+    start_time: Optional[float]  # time.monotonic() 时间戳，用于计算运行时长
     client_count: int
 
 
@@ -72,13 +74,31 @@ class BaseRecorder(ABC):
         pass
 
     @abstractmethod
-    def read_output(self, size: int = -1) -> bytes:
+    def read_output(self, size: int = -1, timeout: float = 0) -> bytes:
         """读取录制输出数据
 
         Args:
             size: 读取字节数
+            timeout: 暂无数据时最多等待的秒数（0 表示不等待）
 
         Returns:
             bytes: 视频数据
         """
         pass
+
+    def read_output_into(self, buffer, timeout: float = 0) -> int:
+        """读取录制输出数据到调用方提供的缓冲区
+
+        默认实现基于 read_output()，子类可覆盖以避免中间拷贝
+
+        Args:
+            buffer: 可写的字节缓冲区（bytearray 或 memoryview）
+            timeout: 暂无数据时最多等待的秒数（0 表示不等待）
+
+        Returns:
+            int: 写入的字节数
+        """
+        out = memoryview(buffer)
+        data = self.read_output(len(out), timeout)
+        out[:len(data)] = data
+        return len(data)
@@ -4,7 +4,8 @@ FFmpeg 命令构建器
 根据配置构建 FFmpeg 命令行参数
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
 import logging
 
 from src.config.config_parser import (
@@ -16,6 +17,39 @@ from src.config.config_parser import (
 from src.exceptions import RecorderStartupError
 
 
+# 与配置无关的固定参数片段（模块加载时构建一次）
+
+# gdigrab 低延迟输入参数：不缓冲、低延迟解码、跳过探测，
+# 并加大输入线程队列避免突发帧溢出
+_GDIGRAB_LOW_DELAY = (
+    "-fflags", "nobuffer",
+    "-flags", "low_delay",
+    "-probesize", "32",
+    "-analyzeduration", "0",
+    "-thread_queue_size", "1024",
+)
+
+# H.264 profile/level（FLV 兼容性）、像素格式，
+# 低延迟：无 B 帧、单参考帧、关闭场景切换插入关键帧（关键帧间隔固定）
+_STATIC_VIDEO_SUFFIX = (
+    "-profile:v", "baseline",
+    "-level", "3.1",
+    "-pix_fmt", "yuv420p",
+    "-bf", "0",
+    "-refs", "1",
+    "-sc_threshold", "0",
+)
+
+# libx264 专用参数：恒定帧率输出、不做场景切换检测
+_X264_LOW_DELAY = ("-x264-params", "force-cfr=1:scenecut=0")
+
+# 音频比特率和采样率
+_STATIC_AUDIO_SUFFIX = ("-b:a", "128k", "-ar", "44100")
+
+# 输出格式 FLV（适合 flv.js WebSocket 播放），输出到标准输出
+_STATIC_OUTPUT = ("-f", "flv", "pipe:1")
+
+
 class FFmpegCommandBuilder:
     """FFmpeg 命令构建器
 
@@ -38,335 +72,345 @@ class FFmpegCommandBuilder:
             config: 配置数据对象
             window_helper: 窗口助手（窗口录制时需要）
         """
-        self.config = config
         self.window_helper = window_helper
         self.logger = logging.getLogger("ScreenStreamer.FFmpegBuilder")
 
-    def build(self) -> List[str]:
-        """构建完整的 FFmpeg 命令
+        # 缓存的命令（配置在运行期间不变，进程重启时直接复用）
+        self._cached_cmd: Optional[List[str]] = None
+
+        # 录制源类型 -> 输入参数构建方法
+        self._source_handlers = {
+            ScreenSourceConfig: self._emit_screen_input,
+            WindowSourceConfig: self._emit_window_input,
+            NetworkStreamSourceConfig: self._emit_network_stream_input,
+        }
+
+        # 网络流 URL 协议 -> 协议特定参数构建方法
+        self._scheme_handlers = {
+            "rtsp": self._emit_rtsp_options,
+            "rtmp": self._emit_rtmp_options,
+            "http": self._emit_http_options,
+            "https": self._emit_http_options,
+        }
+
+        # 通过 setter 设置配置，同时预计算静态参数片段
+        self.config = config
 
-        Returns:
-            List[str]: 命令行参数列表
-            示例: ["ffmpeg.exe", "-f", "gdigrab", ...]
+    @property
+    def config(self) -> ConfigData:
+        """当前使用的配置数据"""
+        return self._config
+
+    @config.setter
+    def config(self, config: ConfigData) -> None:
+        """替换配置，重新计算静态参数片段并清除缓存
+
+        Args:
+            config: 新的配置数据对象
         """
-        cmd = []
+        self._config = config
 
-        # FFmpeg 可执行文件路径
-        cmd.append(self.config.ffmpeg_path)
+        # 区域录制参数（只格式化一次）
+        region = getattr(config.source.source, "region", None)
+        self._region_args: Tuple[str, ...] = (
+            "-offset_x", str(region.x),
+            "-offset_y", str(region.y),
+            "-video_size", f"{region.width}x{region.height}",
+        ) if region else ()
 
-        # 输入参数（录制源）
-        cmd.extend(self._build_input_args())
+        # 输入之后的编码和输出参数只由配置决定，预先构建为元组
+        self._encoder_args: Tuple[str, ...] = self._build_encoder_args()
 
-        # 检查是否是网络流
-        is_network_stream = isinstance(self.config.source.source, NetworkStreamSourceConfig)
+        self.invalidate()
 
-        if is_network_stream:
-            # 网络流：添加流映射参数
-            # -map 0:v:0 映射第一个视频流（必需）
-            # -map 0:a? 映射音频流（可选，不存在则忽略）
-            cmd.extend(["-map", "0:v:0"])
-            cmd.extend(["-map", "0:a?"])
+    def build(self) -> List[str]:
+        """构建完整的 FFmpeg 命令
 
-        # 视频编码参数
-        cmd.extend(self._build_video_args())
+        除窗口录制外（依赖运行时查找的窗口），命令只构建一次并缓存
+
+        Returns:
+            List[str]: 命令行参数列表（副本，调用方可随意修改）
+            示例: ["ffmpeg.exe", "-f", "gdigrab", ...]
+        """
+        if self._cached_cmd is not None:
+            return self._cached_cmd.copy()
 
-        # 音频编码参数
-        cmd.extend(self._build_audio_args())
+        cmd: List[str] = []
+        self._emit_cmd(cmd)
 
-        # 输出参数（stdout）
-        cmd.extend(self._build_output_args())
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("FFmpeg 命令: %s", " ".join(cmd))
 
-        self.logger.debug(f"FFmpeg 命令: {' '.join(cmd)}")
+        # 窗口录制依赖当前窗口状态，每次重新构建
+        if not isinstance(self.config.source.source, WindowSourceConfig):
+            self._cached_cmd = cmd
+            return cmd.copy()
 
         return cmd
 
+    def invalidate(self) -> None:
+        """清除缓存的命令，下次 build() 时重新构建"""
+        self._cached_cmd = None
+
     def __call__(self) -> List[str]:
         """使对象可调用，适配 ProcessManager 的策略接口"""
         return self.build()
 
-    def _build_input_args(self) -> List[str]:
-        """构建输入参数（录制源）"""
-        args = []
-        source = self.config.source.source
-
-        # 根据源类型构建参数
-        if isinstance(source, ScreenSourceConfig):
-            # 屏幕录制：使用 gdigrab
-            args.extend([
-                "-f", "gdigrab",
-                "-framerate", str(self.config.framerate),
-                "-rtbufsize", "100M"  # 缓冲区大小，避免丢帧
-            ])
-            args.extend(self._build_screen_input(source))
-        elif isinstance(source, WindowSourceConfig):
-            # 窗口录制：使用 gdigrab
-            args.extend([
-                "-f", "gdigrab",
-                "-framerate", str(self.config.framerate),
-                "-rtbufsize", "100M"
-            ])
-            args.extend(self._build_window_input(source))
-        elif isinstance(source, NetworkStreamSourceConfig):
-            # 网络流录制：不需要 -f 参数，由 URL 协议决定
-            args.extend(self._build_network_stream_input(source))
-        else:
+    def _emit_cmd(self, cmd: List[str]) -> None:
+        """将完整的 FFmpeg 命令参数依次追加到 cmd（不构建中间列表）
+
+        Args:
+            cmd: 待填充的命令行参数列表
+        """
+        config = self.config
+        source = config.source.source
+
+        # FFmpeg 可执行文件路径
+        cmd.append(config.ffmpeg_path)
+
+        # 输入参数（录制源）
+        handler = self._source_handlers.get(type(source))
+        if handler is None:
             raise RecorderStartupError(f"不支持的录制源类型: {type(source)}")
+        handler(cmd, source)
+
+        # 编码和输出参数（预先构建的静态片段）
+        cmd.extend(self._encoder_args)
+
+    def _build_encoder_args(self) -> Tuple[str, ...]:
+        """构建输入之后的编码和输出参数（只依赖配置，不随运行状态变化）
+
+        Returns:
+            Tuple[str, ...]: 视频编码、音频编码和输出参数
+        """
+        config = self._config
+        source = config.source.source
+        args: List[str] = []
+
+        # 视频编码参数
+        args.extend((
+            "-c:v", config.video_codec,  # 视频编码器
+            "-preset", config.preset,    # 编码预设（速度/压缩比平衡）
+            "-tune", config.tune,        # 编码调优
+            "-b:v", config.bitrate,      # 比特率
+        ))
+        args.extend(_STATIC_VIDEO_SUFFIX)
+        if config.video_codec == "libx264":
+            args.extend(_X264_LOW_DELAY)
+        # 关键帧间隔 = 帧率（每秒一个关键帧，新客户端最多等待 1 秒）
+        args.append("-g")
+        args.append(str(config.framerate))
+
+        # 音频编码参数（gdigrab 没有音频输入，屏幕/窗口录制直接禁用音频）
+        if isinstance(source, NetworkStreamSourceConfig):
+            args.append("-c:a")
+            args.append(config.audio_codec)
+            args.extend(_STATIC_AUDIO_SUFFIX)
+        else:
+            args.append("-an")
+
+        # 输出参数：FLV 输出到 stdout（适合 flv.js 播放器）
+        # 不使用 -flvflags no_duration_filesize，保留完整的 FLV 头和元数据，
+        # 这样可以支持多客户端场景，新客户端能获取完整的初始化信息
+        args.extend(_STATIC_OUTPUT)
+
+        return tuple(args)
 
-        return args
+    def _emit_gdigrab_options(self, cmd: List[str]) -> None:
+        """追加 gdigrab 输入格式参数（屏幕和窗口录制共用）
 
-    def _build_screen_input(self, screen_config: ScreenSourceConfig) -> List[str]:
-        """构建屏幕录制输入参数
+        区域参数属于 gdigrab 输入选项，必须位于 -i 之前
+
+        Args:
+            cmd: 待填充的命令行参数列表
+        """
+        cmd.extend((
+            "-f", "gdigrab",
+            "-framerate", str(self.config.framerate),
+            "-rtbufsize", self.config.rtbufsize  # 缓冲区大小，避免丢帧
+        ))
+        cmd.extend(_GDIGRAB_LOW_DELAY)
+        cmd.extend(self._region_args)
+
+    def _emit_screen_input(self, cmd: List[str], screen_config: ScreenSourceConfig) -> None:
+        """追加屏幕录制输入参数
 
         示例 1 - 全屏录制:
             "-i", "desktop"
 
         示例 2 - 区域录制:
-            "-i", "desktop",
             "-offset_x", "100",
             "-offset_y", "100",
-            "-video_size", "1920x1080"
+            "-video_size", "1920x1080",
+            "-i", "desktop"
         """
-        args = []
+        self._emit_gdigrab_options(cmd)
 
         # 输入源：桌面
-        args.append("-i")
-        args.append("desktop")
-
-        # 区域录制
-        if screen_config.region:
-            region = screen_config.region
-            args.extend([
-                "-offset_x", str(region.x),
-                "-offset_y", str(region.y),
-                "-video_size", f"{region.width}x{region.height}"
-            ])
+        cmd.append("-i")
+        cmd.append("desktop")
 
-        return args
-
-    def _build_window_input(self, window_config: WindowSourceConfig) -> List[str]:
-        """构建窗口录制输入参数
+    def _emit_window_input(self, cmd: List[str], window_config: WindowSourceConfig) -> None:
+        """追加窗口录制输入参数
 
         示例 1 - 完整窗口:
             "-i", "title=窗口标题"
 
         示例 2 - 窗口区域:
-            "-i", "title=窗口标题",
             "-offset_x", "10",
             "-offset_y", "20",
-            "-video_size", "800x600"
+            "-video_size", "800x600",
+            "-i", "title=窗口标题"
         """
-        args = []
+        # 查找窗口句柄和标题（验证窗口存在）
+        window = self._find_window_handle(window_config)
 
-        # 查找窗口句柄（验证窗口存在）
-        hwnd = self._find_window_handle(window_config)
-
-        if not hwnd:
+        if not window:
             raise RecorderStartupError(
                 f"找不到窗口: {window_config.window_title}"
             )
 
+        hwnd, title = window
+
         # 验证窗口状态
         if self.window_helper:
             if not self.window_helper.validate_window(hwnd):
                 self.logger.warning(
-                    f"窗口 {hwnd} 状态异常，可能无法正常录制"
+                    "窗口 %s 状态异常，可能无法正常录制", hwnd
                 )
 
-        # 构建输入源
-        args.append("-i")
-
-        if window_config.window_title:
-            # 使用窗口标题
-            input_source = f"title={window_config.window_title}"
-        else:
-            # 使用窗口句柄（FFmpeg 不直接支持，需要获取标题）
-            title = self.window_helper.get_window_title(hwnd)
-            input_source = f"title={title}"
-
-        args.append(input_source)
+        self._emit_gdigrab_options(cmd)
 
-        # 窗口区域录制
-        if window_config.region:
-            region = window_config.region
-            args.extend([
-                "-offset_x", str(region.x),
-                "-offset_y", str(region.y),
-                "-video_size", f"{region.width}x{region.height}"
-            ])
+        # 构建输入源（FFmpeg gdigrab 按窗口标题捕获）
+        cmd.append("-i")
+        cmd.append(f"title={title}")
 
-        return args
-
-    def _build_network_stream_input(self, stream_config: NetworkStreamSourceConfig) -> List[str]:
-        """构建网络流录制输入参数
+    def _emit_network_stream_input(
+        self,
+        cmd: List[str],
+        stream_config: NetworkStreamSourceConfig
+    ) -> None:
+        """追加网络流录制输入参数
 
         支持 RTSP、RTMP、HTTP-FLV 等网络流协议
 
         Args:
+            cmd: 待填充的命令行参数列表
             stream_config: 网络流源配置
 
-        Returns:
-            List[str]: FFmpeg 输入参数列表
-
         Raises:
             RecorderStartupError: 网络流配置无效
         """
-        args = []
+        config = self.config
 
         # 添加缓冲区大小（网络流优化）
-        args.extend(["-buffer_size", "32768000"])  # 32MB 缓冲区
+        cmd.extend(["-buffer_size", str(config.network_buffer_size)])
 
         # 添加分析时长和探测大小（加快流启动）
-        args.extend(["-analyzeduration", "1000000"])  # 分析 1 秒
-        args.extend(["-probesize", "5000000"])  # 探测 5MB
-        args.extend(["-max_delay", "0"])  # 最小化延迟
+        cmd.extend(["-analyzeduration", str(config.analyze_duration)])
+        cmd.extend(["-probesize", str(config.probe_size)])
+        cmd.extend(["-max_delay", "0"])  # 最小化延迟
+        cmd.extend(["-avioflags", "direct"])  # 绕过 AVIOContext 读缓冲
 
         # 添加超时参数（所有协议通用）
         if stream_config.timeout:
-            args.extend(["-timeout", str(stream_config.timeout)])
+            cmd.extend(["-timeout", str(stream_config.timeout)])
 
         # 根据协议添加特定参数
-        url = stream_config.url.lower()
-
-        if url.startswith("rtsp://"):
-            # RTSP 协议特定参数
-            if stream_config.transport:
-                # 传输协议：tcp、udp、auto
-                args.extend(["-rtsp_transport", stream_config.transport])
-
-            # 添加 RTSP 特定优化
-            args.extend(["-rtsp_flags", "prefer_tcp"])  # 优先使用 TCP
-            args.extend(["-fflags", "+genpts+nobuffer"])  # 生成 PTS，不缓冲
-            args.extend(["-flags", "low_delay"])  # 低延迟标志
-
-            self.logger.info(f"RTSP 流配置: transport={stream_config.transport}")
-
-        elif url.startswith("rtmp://"):
-            # RTMP 协议特定参数
-            args.extend(["-fflags", "+genpts+nobuffer"])
-            args.extend(["-flags", "low_delay"])
-            self.logger.info("RTMP 流配置")
-
-        elif url.startswith("http://") or url.startswith("https://"):
-            # HTTP 协议特定参数
-            # 可以添加自定义 HTTP 头
-            args.extend(["-headers", "User-Agent: Mozilla/5.0"])
-            args.extend(["-fflags", "+genpts+nobuffer"])
-
-            # HTTP 重连参数（仅 HTTP 支持）
-            if stream_config.reconnect_delay and stream_config.max_reconnect_attempts:
-                args.extend(["-reconnect", "1"])
-                args.extend(["-reconnect_streamed", "1"])
-                args.extend(["-reconnect_delay_max", str(stream_config.reconnect_delay)])
-
-            self.logger.info("HTTP-FLV 流配置")
+        scheme_handler = self._scheme_handlers.get(urlsplit(stream_config.url).scheme)
+        if scheme_handler:
+            scheme_handler(cmd, stream_config)
 
         # 添加输入源 URL
-        args.extend(["-i", stream_config.url])
-
-        self.logger.info(f"网络流 URL: {stream_config.url}")
-
-        return args
-
-    def _build_video_args(self) -> List[str]:
-        """构建视频编码参数
-
-        示例: ["-c:v", "libx264", "-preset", "ultrafast",
-                "-tune", "zerolatency", "-b:v", "2M"]
-        """
-        args = []
-
-        # 视频编码器
-        args.extend(["-c:v", self.config.video_codec])
-
-        # 编码预设（速度/压缩比平衡）
-        args.extend(["-preset", self.config.preset])
-
-        # 编码调优
-        args.extend(["-tune", self.config.tune])
-
-        # H.264 profile 和 level（FLV 兼容性）
-        args.extend(["-profile:v", "baseline"])
-        args.extend(["-level", "3.1"])
+        cmd.extend(["-i", stream_config.url])
 
-        # 像素格式
-        args.extend(["-pix_fmt", "yuv420p"])
+        self.logger.info("网络流 URL: %s", stream_config.url)
 
-        # 比特率
-        args.extend(["-b:v", self.config.bitrate])
+        # 网络流：添加流映射参数
+        # -map 0:v:0 映射第一个视频流（必需）
+        # -map 0:a? 映射音频流（可选，不存在则忽略）
+        cmd.extend(("-map", "0:v:0", "-map", "0:a?"))
 
-        # 关键帧间隔（GOP）
-        args.extend(["-g", "30"])  # 每 30 帧一个关键帧
-
-        return args
-
-    def _build_audio_args(self) -> List[str]:
-        """构建音频编码参数
-
-        网络流和本地录制都使用相同的音频编码参数
-
-        示例: ["-c:a", "aac", "-b:a", "128k"]
-        """
-        args = []
-
-        # 音频编码器
-        args.extend(["-c:a", self.config.audio_codec])
-
-        # 音频比特率
-        args.extend(["-b:a", "128k"])
-
-        # 音频采样率
-        args.extend(["-ar", "44100"])
-
-        return args
-
-    def _build_output_args(self) -> List[str]:
-        """构建输出参数（stdout）
-
-        输出到 stdout，格式为 FLV（适合 flv.js 播放器）
-        """
-        args = []
-
-        # 输出格式：FLV（适合 flv.js WebSocket 播放）
-        args.extend(["-f", "flv"])
-
-        # 移除 -flvflags no_duration_filesize，保留完整的 FLV 头和元数据
-        # 这样可以支持多客户端场景，新客户端能获取完整的初始化信息
-        # args.extend(["-flvflags", "no_duration_filesize"])  # 已移除
-
-        # 输出到标准输出
-        args.append("pipe:1")
-
-        return args
-
-    def _find_window_handle(self, window_config: WindowSourceConfig) -> Optional[int]:
-        """查找窗口句柄
+    def _emit_rtsp_options(
+        self,
+        cmd: List[str],
+        stream_config: NetworkStreamSourceConfig
+    ) -> None:
+        """追加 RTSP 协议特定参数"""
+        if stream_config.transport:
+            # 传输协议：tcp、udp、auto
+            cmd.extend(["-rtsp_transport", stream_config.transport])
+
+        # 添加 RTSP 特定优化
+        cmd.extend(["-rtsp_flags", "prefer_tcp"])  # 优先使用 TCP
+        cmd.extend(["-fflags", "+genpts+nobuffer"])  # 生成 PTS，不缓冲
+        cmd.extend(["-flags", "low_delay"])  # 低延迟标志
+
+        self.logger.info("RTSP 流配置: transport=%s", stream_config.transport)
+
+    def _emit_rtmp_options(
+        self,
+        cmd: List[str],
+        stream_config: NetworkStreamSourceConfig
+    ) -> None:
+        """追加 RTMP 协议特定参数"""
+        cmd.extend(["-fflags", "+genpts+nobuffer"])
+        cmd.extend(["-flags", "low_delay"])
+        self.logger.info("RTMP 流配置")
+
+    def _emit_http_options(
+        self,
+        cmd: List[str],
+        stream_config: NetworkStreamSourceConfig
+    ) -> None:
+        """追加 HTTP/HTTPS 协议特定参数"""
+        # 可以添加自定义 HTTP 头
+        cmd.extend(["-headers", "User-Agent: Mozilla/5.0"])
+        cmd.extend(["-fflags", "+genpts+nobuffer"])
+
+        # HTTP 重连参数（仅 HTTP 支持）
+        if stream_config.reconnect_delay and stream_config.max_reconnect_attempts:
+            cmd.extend(["-reconnect", "1"])
+            cmd.extend(["-reconnect_streamed", "1"])
+            cmd.extend(["-reconnect_delay_max", str(stream_config.reconnect_delay)])
+
+        self.logger.info("HTTP-FLV 流配置")
+
+    def _find_window_handle(
+        self,
+        window_config: WindowSourceConfig
+    ) -> Optional[Tuple[int, str]]:
+        """查找窗口句柄及用于 FFmpeg 捕获的窗口标题
 
         Args:
             window_config: 窗口录制源配置
 
         Returns:
-            Optional[int]: 窗口句柄，找不到返回 None
+            Optional[Tuple[int, str]]: (窗口句柄, 窗口标题)，找不到返回 None
         """
         if not self.window_helper:
             self.logger.warning("窗口助手未初始化，跳过窗口查找")
             return None
 
+        # 查找结果由 WindowHelper 缓存（校验句柄存在且标题仍匹配），这里不再另行缓存
+        window = None
+
         # 按优先级尝试不同的查找方式
         if window_config.window_title_pattern:
-            return self.window_helper.find_window_by_pattern(
+            window = self.window_helper.find_window_by_pattern_with_title(
                 window_config.window_title_pattern
             )
-
-        if window_config.window_title:
-            return self.window_helper.find_window_by_title(
+        elif window_config.window_title:
+            hwnd = self.window_helper.find_window_by_title(
                 window_config.window_title,
                 exact_match=not window_config.find_by_substring,
                 case_sensitive=window_config.case_sensitive
             )
-
-        if window_config.window_class:
+            if hwnd:
+                # 使用配置中的窗口标题
+                window = (hwnd, window_config.window_title)
+        elif window_config.window_class:
             # TODO: 实现按窗口类名查找
             self.logger.warning("按窗口类名查找暂未实现")
-            return None
 
-        return None
+        return window
@@ -139,16 +139,29 @@ class FFmpegRecorder(BaseRecorder):
         """
         return self.process_manager.is_running()
 
-    def read_output(self, size: int = 4096) -> bytes:
+    def read_output(self, size: int = 4096, timeout: float = 0) -> bytes:
         """读取 FFmpeg 输出
 
         Args:
             size: 读取字节数
+            timeout: 暂无数据时最多等待的秒数（0 表示不等待）
 
         Returns:
             bytes: 视频数据
         """
-        return self.process_manager.read_output(size)
+        return self.process_manager.read_output(size, timeout)
+
+    def read_output_into(self, buffer, timeout: float = 0) -> int:
+        """读取 FFmpeg 输出到调用方提供的缓冲区
+
+        Args:
+            buffer: 可写的字节缓冲区（bytearray 或 memoryview）
+            timeout: 暂无数据时最多等待的秒数（0 表示不等待）
+
+        Returns:
+            int: 写入的字节数
+        """
+        return self.process_manager.read_output_into(buffer, timeout)
 
     def handle_crash(self) -> bool:
         """处理崩溃
@@ -161,6 +174,9 @@ class FFmpegRecorder(BaseRecorder):
         # 记录崩溃
         self.health_monitor.record_crash()
 
+        # 崩溃可能源于窗口关闭或变化，重启前重新构建命令
+        self.command_builder.invalidate()
+
         # 判断是否应该重启
         should_restart = self.health_monitor.should_restart()
 
@@ -6,9 +6,50 @@ Windows 窗口助手
 
 import ctypes
 from ctypes import wintypes
-from typing import Optional, List, Tuple
+from typing import Callable, Optional, List, Tuple
 import re
 import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+
+# 窗口标题缓冲区大小（字符数）
+_TITLE_BUFFER_SIZE = 512
+
+# 窗口查找缓存最多保留的条目数
+_WINDOW_CACHE_SIZE = 16
+
+
+def _title_contains(title: str, target: str, case_sensitive: bool) -> bool:
+    """检查窗口标题是否包含目标子串
+
+    Args:
+        title: 窗口标题
+        target: 目标子串
+        case_sensitive: 是否区分大小写
+
+    Returns:
+        bool: 是否包含
+    """
+    if case_sensitive:
+        return target in title
+    return target.lower() in title.lower()
+
+
+@lru_cache(maxsize=32)
+def _compile_pattern(pattern: str) -> "re.Pattern":
+    """编译窗口标题正则表达式（结果缓存，重复查找时不再编译）
+
+    Args:
+        pattern: 正则表达式
+
+    Returns:
+        re.Pattern: 编译后的正则表达式
+
+    Raises:
+        re.error: 正则表达式无效
+    """
+    return re.compile(pattern)
 
 
 class WindowHelper:
@@ -27,6 +68,10 @@ class WindowHelper:
             logger: 日志记录器
         """
         self.logger = logger
+
+        # 窗口查找缓存：查找条件 -> 窗口句柄（按最近使用排序）
+        self._window_cache: "OrderedDict[tuple, int]" = OrderedDict()
+
         self._setup_winapi()
 
     def _setup_winapi(self) -> None:
@@ -49,6 +94,13 @@ class WindowHelper:
             ]
             self.user32.GetWindowTextW.restype = wintypes.INT
 
+            # 配置 GetWindowTextLengthW（只取长度，不复制标题）
+            self.user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+            self.user32.GetWindowTextLengthW.restype = wintypes.INT
+
+            # 窗口标题缓冲区（复用，枚举窗口时避免每个窗口分配一次）
+            self._title_buf = ctypes.create_unicode_buffer(_TITLE_BUFFER_SIZE)
+
             # 配置 GetWindowRect
             self.user32.GetWindowRect.argtypes = [
                 wintypes.HWND,                          # 窗口句柄
@@ -60,6 +112,10 @@ class WindowHelper:
             self.user32.IsWindowVisible.argtypes = [wintypes.HWND]
             self.user32.IsWindowVisible.restype = wintypes.BOOL
 
+            # 配置 IsWindow（检查句柄是否仍指向存在的窗口）
+            self.user32.IsWindow.argtypes = [wintypes.HWND]
+            self.user32.IsWindow.restype = wintypes.BOOL
+
             # 配置 IsIconic（检查是否最小化）
             self.user32.IsIconic.argtypes = [wintypes.HWND]
             self.user32.IsIconic.restype = wintypes.BOOL
@@ -76,10 +132,14 @@ class WindowHelper:
             ]
             self.user32.EnumWindows.restype = wintypes.BOOL
 
+            # 唯一的 EnumWindows 回调（只创建一次），每次枚举替换 _enum_visitor
+            self._enum_visitor: Optional[Callable[[int], bool]] = None
+            self._enum_proc = self.WNDENUMPROC(self._dispatch_enum)
+
             self.logger.debug("Windows API 配置成功")
 
         except Exception as e:
-            self.logger.error(f"Windows API 配置失败: {e}")
+            self.logger.error("Windows API 配置失败: %s", e)
             raise
 
     def find_window_by_title(
@@ -98,22 +158,32 @@ class WindowHelper:
         Returns:
             Optional[int]: 窗口句柄，找不到返回 None
         """
-        self.logger.info(f"查找窗口: '{title}' (精确={exact_match})")
+        self.logger.info("查找窗口: '%s' (精确=%s)", title, exact_match)
 
         if exact_match:
             # 精确匹配
             hwnd = self.user32.FindWindowW(None, title)
             if hwnd:
-                self.logger.info(f"找到窗口: HWND={hwnd}")
+                self.logger.info("找到窗口: HWND=%s", hwnd)
                 return hwnd
         else:
-            # 枚举所有窗口进行模糊匹配
+            # 枚举所有窗口进行模糊匹配（结果缓存，窗口仍存在且标题仍匹配时跳过枚举）
+            cache_key = ("title", title, case_sensitive)
+            hwnd = self._get_cached_window(cache_key)
+            if hwnd:
+                # 窗口关闭后句柄可能被分配给其他窗口，重新核对标题
+                if _title_contains(self.get_window_title(hwnd), title, case_sensitive):
+                    self.logger.info("找到窗口（缓存）: HWND=%s", hwnd)
+                    return hwnd
+                del self._window_cache[cache_key]
+
             hwnd = self._enum_windows(title, case_sensitive)
             if hwnd:
-                self.logger.info(f"找到窗口: HWND={hwnd}")
+                self.logger.info("找到窗口: HWND=%s", hwnd)
+                self._cache_window(cache_key, hwnd)
                 return hwnd
 
-        self.logger.warning(f"未找到窗口: '{title}'")
+        self.logger.warning("未找到窗口: '%s'", title)
         return None
 
     def find_window_by_pattern(self, pattern: str) -> Optional[int]:
@@ -125,21 +195,44 @@ class WindowHelper:
         Returns:
             Optional[int]: 窗口句柄
         """
-        self.logger.info(f"使用正则查找窗口: '{pattern}'")
+        window = self.find_window_by_pattern_with_title(pattern)
+        return window[0] if window else None
+
+    def find_window_by_pattern_with_title(self, pattern: str) -> Optional[Tuple[int, str]]:
+        """根据正则表达式查找窗口，同时返回枚举时读取到的标题
+
+        Args:
+            pattern: 正则表达式
+
+        Returns:
+            Optional[Tuple[int, str]]: (窗口句柄, 窗口标题)，找不到返回 None
+        """
+        self.logger.info("使用正则查找窗口: '%s'", pattern)
 
         try:
-            regex = re.compile(pattern)
+            regex = _compile_pattern(pattern)
         except re.error as e:
-            self.logger.error(f"无效的正则表达式: {e}")
+            self.logger.error("无效的正则表达式: %s", e)
             return None
 
-        hwnd = self._enum_windows_regex(regex)
-
+        # 缓存的窗口仍存在且标题仍匹配时跳过枚举
+        cache_key = ("pattern", pattern)
+        hwnd = self._get_cached_window(cache_key)
         if hwnd:
-            self.logger.info(f"找到窗口: HWND={hwnd}")
-            return hwnd
+            title = self.get_window_title(hwnd)
+            if regex.search(title):
+                self.logger.info("找到窗口（缓存）: HWND=%s", hwnd)
+                return hwnd, title
+            del self._window_cache[cache_key]
+
+        window = self._enum_windows_regex(regex)
 
-        self.logger.warning(f"未找到匹配窗口: '{pattern}'")
+        if window:
+            self.logger.info("找到窗口: HWND=%s", window[0])
+            self._cache_window(cache_key, window[0])
+            return window
+
+        self.logger.warning("未找到匹配窗口: '%s'", pattern)
         return None
 
     def get_window_title(self, hwnd: int) -> str:
@@ -151,10 +244,9 @@ class WindowHelper:
         Returns:
             str: 窗口标题
         """
-        buffer_size = 512
-        buffer = ctypes.create_unicode_buffer(buffer_size)
-        self.user32.GetWindowTextW(hwnd, buffer, buffer_size)
-        return buffer.value
+        # 复用同一缓冲区（EnumWindows 回调在调用线程内同步执行）
+        self.user32.GetWindowTextW(hwnd, self._title_buf, _TITLE_BUFFER_SIZE)
+        return self._title_buf.value
 
     def get_window_rect(self, hwnd: int) -> Tuple[int, int, int, int]:
         """获取窗口矩形区域
@@ -183,6 +275,17 @@ class WindowHelper:
         left, top, right, bottom = self.get_window_rect(hwnd)
         return (right - left, bottom - top)
 
+    def is_window(self, hwnd: int) -> bool:
+        """检查句柄是否仍指向存在的窗口
+
+        Args:
+            hwnd: 窗口句柄
+
+        Returns:
+            bool: 窗口是否存在
+        """
+        return bool(self.user32.IsWindow(hwnd))
+
     def is_window_visible(self, hwnd: int) -> bool:
         """检查窗口是否可见
 
@@ -218,15 +321,59 @@ class WindowHelper:
             return False
 
         if not self.is_window_visible(hwnd):
-            self.logger.warning(f"窗口 {hwnd} 不可见")
+            self.logger.warning("窗口 %s 不可见", hwnd)
+            self._forget_window(hwnd)
             return False
 
         if self.is_minimized(hwnd):
-            self.logger.warning(f"窗口 {hwnd} 已最小化")
+            self.logger.warning("窗口 %s 已最小化", hwnd)
+            self._forget_window(hwnd)
             return False
 
         return True
 
+    def _get_cached_window(self, key: tuple) -> Optional[int]:
+        """从缓存取出窗口句柄（句柄已失效时移除）
+
+        Args:
+            key: 查找条件
+
+        Returns:
+            Optional[int]: 窗口句柄，未命中返回 None
+        """
+        hwnd = self._window_cache.get(key)
+        if hwnd is None:
+            return None
+
+        if not self.is_window(hwnd):
+            del self._window_cache[key]
+            return None
+
+        self._window_cache.move_to_end(key)
+        return hwnd
+
+    def _cache_window(self, key: tuple, hwnd: int) -> None:
+        """缓存窗口句柄（超出容量时淘汰最久未使用的条目）
+
+        Args:
+            key: 查找条件
+            hwnd: 窗口句柄
+        """
+        self._window_cache[key] = hwnd
+        self._window_cache.move_to_end(key)
+
+        if len(self._window_cache) > _WINDOW_CACHE_SIZE:
+            self._window_cache.popitem(last=False)
+
+    def _forget_window(self, hwnd: int) -> None:
+        """从缓存中移除指向指定窗口的所有条目
+
+        Args:
+            hwnd: 窗口句柄
+        """
+        for key in [k for k, v in self._window_cache.items() if v == hwnd]:
+            del self._window_cache[key]
+
     def list_all_windows(self) -> List[Tuple[int, str]]:
         """列出所有窗口（用于调试）
 
@@ -235,18 +382,33 @@ class WindowHelper:
         """
         windows = []
 
-        def enum_callback(hwnd, lparam):
-            if self.is_window_visible(hwnd):
+        def enum_callback(hwnd):
+            if self.is_window_visible(hwnd) and self.user32.GetWindowTextLengthW(hwnd):
                 title = self.get_window_title(hwnd)
                 if title:
                     windows.append((hwnd, title))
             return True
 
-        callback = self.WNDENUMPROC(enum_callback)
-        self.user32.EnumWindows(callback, 0)
+        self._enum(enum_callback)
 
         return windows
 
+    def _enum(self, visitor: Callable[[int], bool]) -> None:
+        """枚举所有顶层窗口
+
+        Args:
+            visitor: 窗口访问函数，接收窗口句柄，返回 False 停止枚举
+        """
+        self._enum_visitor = visitor
+        try:
+            self.user32.EnumWindows(self._enum_proc, 0)
+        finally:
+            self._enum_visitor = None
+
+    def _dispatch_enum(self, hwnd: int, lparam: int) -> bool:
+        """EnumWindows 回调：转发给当前的窗口访问函数"""
+        return self._enum_visitor(hwnd)
+
     def _enum_windows(
         self,
         target_title: str,
@@ -263,53 +425,53 @@ class WindowHelper:
         """
         found_hwnd = [None]
 
-        def enum_callback(hwnd, lparam):
+        def enum_callback(hwnd):
             """枚举回调"""
+            # 先取标题长度，跳过无标题窗口（避免复制标题）
+            if not self.user32.GetWindowTextLengthW(hwnd):
+                return True
+
             title = self.get_window_title(hwnd)
             if not title:
                 return True  # 继续枚举
 
-            # 匹配逻辑
-            if case_sensitive:
-                match = target_title in title
-            else:
-                match = target_title.lower() in title.lower()
-
-            if match:
+            if _title_contains(title, target_title, case_sensitive):
                 # 找到匹配，存储句柄并停止枚举
                 found_hwnd[0] = hwnd
                 return False  # 停止枚举
 
             return True  # 继续枚举
 
-        callback = self.WNDENUMPROC(enum_callback)
-        self.user32.EnumWindows(callback, 0)
+        self._enum(enum_callback)
 
         return found_hwnd[0]
 
-    def _enum_windows_regex(self, pattern: re.Pattern) -> Optional[int]:
+    def _enum_windows_regex(self, pattern: re.Pattern) -> Optional[Tuple[int, str]]:
         """使用正则表达式枚举窗口
 
         Args:
             pattern: 编译后的正则表达式
 
         Returns:
-            Optional[int]: 窗口句柄
+            Optional[Tuple[int, str]]: (窗口句柄, 窗口标题)
         """
-        found_hwnd = [None]
+        found_window = [None]
+
+        def enum_callback(hwnd):
+            # 先取标题长度，跳过无标题窗口（避免复制标题）
+            if not self.user32.GetWindowTextLengthW(hwnd):
+                return True
 
-        def enum_callback(hwnd, lparam):
             title = self.get_window_title(hwnd)
             if not title:
                 return True
 
             if pattern.search(title):
-                found_hwnd[0] = hwnd
+                found_window[0] = (hwnd, title)
                 return False
 
             return True
 
-        callback = self.WNDENUMPROC(enum_callback)
-        self.user32.EnumWindows(callback, 0)
+        self._enum(enum_callback)
 
-        return found_hwnd[0]
+        return found_window[0]
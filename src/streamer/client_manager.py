@@ -4,20 +4,66 @@
 管理所有 WebSocket 客户端连接
 """
 
-import uuid
-from typing import Dict, List, Optional
-from datetime import datetime
+import asyncio
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 import logging
 
+from websockets.frames import Frame, Opcode
+
+
+# 每个客户端发送队列最多缓存的帧数量（超出说明客户端接收过慢）
+_CLIENT_QUEUE_SIZE = 256
+
+# 发送队列溢出时关闭连接使用的关闭码（1013: Try Again Later）
+_SLOW_CLIENT_CLOSE_CODE = 1013
+
+
+def encode_binary_frame(data: bytes) -> bytes:
+    """将数据编码为完整的 WebSocket 二进制帧（帧头 + 负载）
+
+    服务端发出的帧不加掩码，编码结果与接收方无关，可被所有客户端共享。
+
+    Args:
+        data: 负载数据
+
+    Returns:
+        bytes: 编码后的帧字节
+    """
+    return Frame(Opcode.BINARY, data).serialize(mask=False)
+
+
+async def write_frame_bytes(
+    websocket: 'WebSocketServerProtocol',
+    frame_bytes: bytes
+) -> None:
+    """将预编码的帧直接写入连接的传输层
+
+    Args:
+        websocket: WebSocket 连接对象
+        frame_bytes: encode_binary_frame 生成的帧字节
+
+    Raises:
+        ConnectionClosed: 连接已关闭
+    """
+    # 连接已关闭时抛出 ConnectionClosed，与 send() 的行为一致
+    await websocket.ensure_open()
+    websocket.transport.write(frame_bytes)
+    # 遵循传输层的写缓冲水位，慢客户端在此处背压
+    await websocket.drain()
+
 
 @dataclass
 class ConnectionInfo:
     """客户端连接信息"""
     client_id: str
     websocket: 'WebSocketServerProtocol'  # 类型注解（字符串避免循环导入）
-    connect_time: datetime
+    connect_time: int  # 连接时刻（time.monotonic_ns()，仅用于计算连接时长）
     is_authenticated: bool = True
+    queue: Optional[asyncio.Queue] = None  # 待发送的帧
+    writer_task: Optional[asyncio.Task] = None  # 发送任务，依次发送队列中的帧
 
 
 class ClientManager:
@@ -38,54 +84,97 @@ class ClientManager:
         """
         self.shutdown_timeout = shutdown_timeout
         self.logger = logger
-        self.clients: Dict[str, ConnectionInfo] = {}
+        # 客户端按列存储（SoA）：广播只需遍历发送队列列表
+        # 三个列表按下标一一对应，_index 记录客户端 ID 到下标的映射
+        self._ids: List[str] = []
+        self._queues: List[asyncio.Queue] = []
+        self._infos: List[ConnectionInfo] = []
+        self._index: Dict[str, int] = {}
+
+        # 客户端 ID 计数器（ID 只用于索引和日志，无需全局唯一）
+        self._id_counter = itertools.count(1)
+
+        # 正在关闭的慢客户端连接（持有任务引用，避免任务被回收）
+        self._closing_tasks = set()
+
+        # 最近一次编码的初始化数据帧：(初始化数据, 帧字节)
+        # GOP 未变化时 GOPBuffer 返回同一个 bytes 对象，后续加入的客户端直接复用已编码的帧
+        self._initial_frame: Optional[Tuple[bytes, bytes]] = None
 
         self.logger.debug(
-            f"客户端管理器已初始化，关闭超时: {shutdown_timeout}秒"
+            "客户端管理器已初始化，关闭超时: %s秒", shutdown_timeout
         )
 
     def add_client(
         self,
         client_id: str,
-        websocket: 'WebSocketServerProtocol'
+        websocket: 'WebSocketServerProtocol',
+        initial_data: Optional[bytes] = None
     ) -> ConnectionInfo:
-        """添加客户端
+        """添加客户端，并启动该客户端的发送任务
 
         Args:
             client_id: 客户端 ID
             websocket: WebSocket 连接对象
+            initial_data: 最先发送的数据（可选，排在所有广播数据之前）
 
         Returns:
             ConnectionInfo: 连接信息对象
         """
+        # 同一 ID 重复添加时替换原有连接
+        self._detach_client(client_id, stop_writer=True)
+
         conn_info = ConnectionInfo(
             client_id=client_id,
             websocket=websocket,
-            connect_time=datetime.now()
+            connect_time=time.monotonic_ns(),
+            queue=asyncio.Queue(maxsize=_CLIENT_QUEUE_SIZE)
         )
+        if initial_data:
+            # 新建的队列为空，不会溢出
+            conn_info.queue.put_nowait(self._encode_initial_frame(initial_data))
+        conn_info.writer_task = asyncio.create_task(self._writer_loop(conn_info))
 
-        self.clients[client_id] = conn_info
+        self._index[client_id] = len(self._ids)
+        self._ids.append(client_id)
+        self._queues.append(conn_info.queue)
+        self._infos.append(conn_info)
 
         self.logger.info(
-            f"客户端已添加: {client_id}，"
-            f"当前连接数: {len(self.clients)}"
+            "客户端已添加: %s，当前连接数: %d", client_id, len(self._ids)
         )
 
         return conn_info
 
+    def _encode_initial_frame(self, initial_data: bytes) -> bytes:
+        """编码初始化数据帧（与上次为同一对象时复用已编码的帧）
+
+        Args:
+            initial_data: 初始化数据
+
+        Returns:
+            bytes: 编码后的帧字节
+        """
+        cached = self._initial_frame
+        if cached is not None and cached[0] is initial_data:
+            return cached[1]
+
+        frame_bytes = encode_binary_frame(initial_data)
+        self._initial_frame = (initial_data, frame_bytes)
+        return frame_bytes
+
     def remove_client(self, client_id: str) -> None:
         """移除客户端
 
         Args:
             client_id: 客户端 ID
         """
-        if client_id in self.clients:
-            del self.clients[client_id]
+        if not self._detach_client(client_id, stop_writer=True):
+            return
 
-            self.logger.info(
-                f"客户端已移除: {client_id}，"
-                f"剩余连接数: {len(self.clients)}"
-            )
+        self.logger.info(
+            "客户端已移除: %s，剩余连接数: %d", client_id, len(self._ids)
+        )
 
     def get_client(self, client_id: str) -> Optional[ConnectionInfo]:
         """获取客户端信息
@@ -96,7 +185,8 @@ class ClientManager:
         Returns:
             Optional[ConnectionInfo]: 客户端信息，不存在返回 None
         """
-        return self.clients.get(client_id)
+        index = self._index.get(client_id)
+        return self._infos[index] if index is not None else None
 
     def get_all_clients(self) -> Dict[str, ConnectionInfo]:
         """获取所有客户端
@@ -104,7 +194,7 @@ class ClientManager:
         Returns:
             Dict[str, ConnectionInfo]: 客户端字典
         """
-        return self.clients.copy()
+        return dict(zip(self._ids, self._infos))
 
     def get_client_count(self) -> int:
         """获取客户端数量
@@ -112,44 +202,112 @@ class ClientManager:
         Returns:
             int: 客户端数量
         """
-        return len(self.clients)
+        return len(self._ids)
 
     async def broadcast(self, data: bytes) -> None:
         """向所有客户端广播数据
 
+        帧只编码一次并放入每个客户端的发送队列，由各自的发送任务写出，
+        慢客户端不会阻塞转发循环和其他客户端
+
         Args:
             data: 要发送的数据
         """
-        if not self.clients:
+        if not self._ids:
             return
 
-        # 记录发送前的客户端数
-        initial_count = len(self.clients)
+        # 帧只编码一次，所有客户端共享同一份帧字节
+        frame_bytes = encode_binary_frame(data)
 
-        # 创建客户端列表副本（避免迭代时修改字典）
-        client_items = list(self.clients.items())
+        slow_clients = []
 
-        # 遍历所有客户端
-        failed_clients = []
-
-        for client_id, conn_info in client_items:
+        for client_id, queue in zip(self._ids, self._queues):
             try:
-                await conn_info.websocket.send(data)
-            except Exception as e:
-                self.logger.error(
-                    f"发送数据到客户端 {client_id} 失败: {e}"
-                )
-                failed_clients.append(client_id)
-
-        # 移除失败的客户端
-        for client_id in failed_clients:
-            self.remove_client(client_id)
-
-        if failed_clients:
-            self.logger.warning(
-                f"广播完成，成功: {initial_count - len(failed_clients)}/{initial_count}，"
-                f"失败: {len(failed_clients)}"
+                queue.put_nowait(frame_bytes)
+            except asyncio.QueueFull:
+                # 丢弃部分数据会破坏 FLV 流，直接断开接收过慢的客户端
+                slow_clients.append(client_id)
+
+        for client_id in slow_clients:
+            self._disconnect_slow_client(client_id)
+
+    def _disconnect_slow_client(self, client_id: str) -> None:
+        """断开发送队列已满的客户端
+
+        Args:
+            client_id: 客户端 ID
+        """
+        conn_info = self.get_client(client_id)
+        self._detach_client(client_id, stop_writer=True)
+
+        # 停止发送后关闭连接（发送缓冲区已满，close() 可能需要等待超时）
+        task = asyncio.create_task(
+            conn_info.websocket.close(_SLOW_CLIENT_CLOSE_CODE, "client too slow")
+        )
+        self._closing_tasks.add(task)
+        task.add_done_callback(self._closing_tasks.discard)
+
+        self.logger.warning(
+            "客户端 %s 接收过慢（发送队列已满），断开连接，剩余连接数: %d",
+            client_id, len(self._ids)
+        )
+
+    def _detach_client(self, client_id: str, stop_writer: bool) -> bool:
+        """从客户端列表中移除客户端
+
+        Args:
+            client_id: 客户端 ID
+            stop_writer: 是否取消该客户端的发送任务
+
+        Returns:
+            bool: 客户端是否存在
+        """
+        index = self._index.pop(client_id, None)
+        if index is None:
+            return False
+
+        conn_info = self._infos[index]
+
+        # 用最后一个元素填补空位（O(1) 删除，不保持顺序）
+        last_id = self._ids.pop()
+        last_queue = self._queues.pop()
+        last_info = self._infos.pop()
+
+        if index < len(self._ids):
+            self._ids[index] = last_id
+            self._queues[index] = last_queue
+            self._infos[index] = last_info
+            self._index[last_id] = index
+
+        if stop_writer and conn_info.writer_task:
+            conn_info.writer_task.cancel()
+
+        return True
+
+    async def _writer_loop(self, conn_info: ConnectionInfo) -> None:
+        """客户端发送任务：依次发送队列中的帧
+
+        Args:
+            conn_info: 客户端连接信息
+        """
+        queue = conn_info.queue
+        websocket = conn_info.websocket
+
+        try:
+            while True:
+                frame_bytes = await queue.get()
+                await write_frame_bytes(websocket, frame_bytes)
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            self.logger.error(
+                "发送数据到客户端 %s 失败: %s", conn_info.client_id, e
             )
+            # 只移除仍是当前连接的客户端（可能已被替换）
+            if self.get_client(conn_info.client_id) is conn_info:
+                self._detach_client(conn_info.client_id, stop_writer=False)
 
     def is_empty(self) -> bool:
         """检查是否有客户端连接
@@ -157,7 +315,7 @@ class ClientManager:
         Returns:
             bool: True 表示没有客户端
         """
-        return len(self.clients) == 0
+        return not self._ids
 
     def generate_client_id(self) -> str:
         """生成唯一的客户端 ID
@@ -165,15 +323,24 @@ class ClientManager:
         Returns:
             str: 客户端 ID
         """
-        return str(uuid.uuid4())
+        return f"c{next(self._id_counter):x}"
 
     def clear_all(self) -> None:
         """清除所有客户端连接"""
-        count = len(self.clients)
-        self.clients.clear()
+        count = len(self._ids)
+
+        for conn_info in self._infos:
+            if conn_info.writer_task:
+                conn_info.writer_task.cancel()
+
+        self._ids.clear()
+        self._queues.clear()
+        self._infos.clear()
+        self._index.clear()
+        self._initial_frame = None
 
         if count > 0:
-            self.logger.info(f"已清除所有客户端连接，共 {count} 个")
+            self.logger.info("已清除所有客户端连接，共 %s 个", count)
 
     def get_client_ids(self) -> List[str]:
         """获取所有客户端 ID 列表
@@ -181,26 +348,27 @@ class ClientManager:
         Returns:
             List[str]: 客户端 ID 列表
         """
-        return list(self.clients.keys())
+        return list(self._ids)
 
     async def send_to_client(self, client_id: str, data: bytes) -> bool:
         """向指定客户端发送数据
 
+        数据放入该客户端的发送队列，与广播数据保持先后顺序
+
         Args:
             client_id: 客户端 ID
             data: 要发送的数据
 
         Returns:
-            bool: 发送是否成功
+            bool: 是否已放入发送队列
         """
         conn_info = self.get_client(client_id)
         if not conn_info:
             return False
 
         try:
-            await conn_info.websocket.send(data)
+            conn_info.queue.put_nowait(encode_binary_frame(data))
             return True
-        except Exception as e:
-            self.logger.error(f"发送数据到客户端 {client_id} 失败: {e}")
-            self.remove_client(client_id)
+        except asyncio.QueueFull:
+            self._disconnect_slow_client(client_id)
             return False
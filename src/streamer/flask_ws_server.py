@@ -4,15 +4,30 @@ Flask WebSocket 流媒体服务器
 使用 Flask + flask-sock 实现 WebSocket-FLV 推流
 """
 
-import asyncio
 import logging
-from typing import Optional, Set
+import queue
+import threading
+from typing import Dict, Optional
 from flask import Flask
 from flask_sock import Sock
 from simple_websocket import Server
 
 from src.recorder.base_recorder import BaseRecorder
 from src.config.config_parser import ConfigData
+from src.streamer.output_reader import read_coalesced
+
+
+# 每个客户端发送队列最多缓存的数据块数量（超出说明客户端接收过慢）
+_CLIENT_QUEUE_SIZE = 64
+
+# 有客户端但暂无数据时，重新检查客户端数量的间隔（秒）
+_IDLE_CHECK_INTERVAL = 0.1
+
+# 每次转发最多合并的字节数（转发线程的暂存缓冲区大小）
+_READ_BUFFER_SIZE = 65536
+
+# 所有客户端断开后关闭 FFmpeg 的等待时间（秒）
+_NO_CLIENT_TIMEOUT = 30
 
 
 class FlaskWebSocketStreamer:
@@ -41,11 +56,14 @@ class FlaskWebSocketStreamer:
         # 创建 WebSocket 扩展
         self.sock = Sock(self.app)
 
-        # WebSocket 连接集合
-        self.clients: Set[Server] = set()
+        # WebSocket 连接 -> 该连接的发送队列（由独立的发送线程消费）
+        self.clients: Dict[Server, queue.Queue] = {}
+        self._clients_lock = threading.Lock()
+
+        # 是否有客户端连接（转发线程无客户端时阻塞等待该事件，而不是轮询计时）
+        self._has_clients = threading.Event()
 
-        # 流转发任务
-        self._forwarding_task: Optional[asyncio.Task] = None
+        # 流转发状态
         self._is_running = False
 
         # 注册路由
@@ -74,8 +92,17 @@ class FlaskWebSocketStreamer:
             """处理 WebSocket 连接"""
             self.logger.info("🔗 客户端连接")
 
-            # 添加客户端
-            self.clients.add(ws)
+            # 添加客户端，并启动其发送线程
+            send_queue: queue.Queue = queue.Queue(maxsize=_CLIENT_QUEUE_SIZE)
+            with self._clients_lock:
+                self.clients[ws] = send_queue
+                self._has_clients.set()
+            threading.Thread(
+                target=self._sender,
+                args=(ws, send_queue),
+                daemon=True,
+                name=f"ws-send-{id(ws)}"
+            ).start()
             self.logger.info(f"客户端已添加，当前连接数: {len(self.clients)}")
 
             # 启动 FFmpeg（如果未运行）
@@ -97,14 +124,74 @@ class FlaskWebSocketStreamer:
             except Exception as e:
                 self.logger.error(f"WebSocket 错误: {e}")
             finally:
-                # 移除客户端
-                self.clients.discard(ws)
+                # 移除客户端，并通知发送线程退出
+                send_queue = self._remove_client(ws)
+                if send_queue is not None:
+                    self._stop_sender(send_queue)
                 self.logger.info(f"🔌 客户端断开，剩余客户端: {len(self.clients)}")
 
                 # 如果没有客户端了，计划关闭 FFmpeg
                 if len(self.clients) == 0:
-                    self.logger.info("⏳ 所有客户端已断开，30 秒后将关闭 FFmpeg...")
-                    # 注意：实际超时逻辑在转发任务中处理
+                    self.logger.info(
+                        f"⏳ 所有客户端已断开，{_NO_CLIENT_TIMEOUT} 秒后将关闭 FFmpeg..."
+                    )
+                    # 注意：实际超时逻辑在转发线程中处理
+
+    def _remove_client(self, ws: Server) -> Optional[queue.Queue]:
+        """移除客户端，最后一个客户端移除时清除 _has_clients 事件
+
+        Args:
+            ws: WebSocket 连接
+
+        Returns:
+            Optional[queue.Queue]: 该客户端的发送队列，已被移除返回 None
+        """
+        with self._clients_lock:
+            send_queue = self.clients.pop(ws, None)
+            if not self.clients:
+                self._has_clients.clear()
+        return send_queue
+
+    def _sender(self, ws: Server, send_queue: queue.Queue):
+        """发送线程：依次发送队列中的数据块，慢客户端不会阻塞其他客户端
+
+        Args:
+            ws: WebSocket 连接
+            send_queue: 该连接的发送队列（None 表示退出）
+        """
+        try:
+            while True:
+                data = send_queue.get()
+                if data is None:
+                    break
+                ws.send(data)
+        except Exception as e:
+            self.logger.warning(f"发送失败，移除客户端: {e}")
+            self._remove_client(ws)
+        finally:
+            # 关闭连接，使连接处理函数的 receive() 返回并完成清理
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _stop_sender(send_queue: queue.Queue):
+        """丢弃队列中尚未发送的数据，并通知发送线程退出
+
+        Args:
+            send_queue: 客户端的发送队列
+        """
+        try:
+            while True:
+                send_queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            send_queue.put_nowait(None)
+        except queue.Full:
+            # 转发线程刚好又放入了数据，发送线程会在连接关闭后发送失败并退出
+            pass
 
     def _start_forwarding(self):
         """启动流转发任务"""
@@ -114,87 +201,56 @@ class FlaskWebSocketStreamer:
         self._is_running = True
         self.logger.info("启动流转发器...")
 
-        # 在新线程中运行异步任务
-        import threading
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        # 在独立线程中运行转发循环（同步阻塞读取，无需事件循环）
+        threading.Thread(
+            target=self._forwarding_loop_sync,
+            daemon=True,
+            name="flv-forwarder"
+        ).start()
 
-        def run_forwarding():
-            loop.run_until_complete(self._forwarding_loop())
+    def _forwarding_loop_sync(self):
+        """流转发循环（在转发线程中运行）"""
+        # 转发线程独占的暂存缓冲区（跨次复用，不为每次读取分配）
+        buffer = bytearray(_READ_BUFFER_SIZE)
 
-        thread = threading.Thread(target=run_forwarding, daemon=True)
-        thread.start()
-
-    async def _forwarding_loop(self):
-        """流转发循环"""
         try:
-            last_client_count = 0
-            no_client_timer = 0
             log_counter = 0  # 减少日志输出
 
             while self._is_running:
-                client_count = len(self.clients)
-
-                # 检查是否有客户端
-                if client_count == 0:
-                    # 没有客户端，开始计时
-                    if last_client_count > 0:
-                        no_client_timer = 0
-                        self.logger.info("开始无客户端计时...")
-
-                    no_client_timer += 1
-
-                    # 每 3 秒打印一次日志，而不是每次循环
-                    if no_client_timer % 30 == 0:
-                        self.logger.info(f"无客户端计时中... {no_client_timer / 10:.1f} 秒")
-
-                    # 30 秒后关闭 FFmpeg
-                    if no_client_timer >= 300:  # 30秒 (0.1秒 * 300)
+                # 没有客户端：阻塞等待新客户端连接，超时后关闭 FFmpeg
+                if not self._has_clients.is_set():
+                    self.logger.info("开始无客户端计时...")
+                    if not self._has_clients.wait(timeout=_NO_CLIENT_TIMEOUT):
                         self.logger.info("⏰ 超时到达，关闭 FFmpeg...")
                         if self.recorder.is_running():
                             self.recorder.stop()
                         self._is_running = False
                         break
-
-                    await asyncio.sleep(0.1)
                     continue
-                else:
-                    # 有客户端，重置计时器
-                    no_client_timer = 0
-
-                # 读取并转发数据
-                if self.recorder.is_running():
-                    try:
-                        # 在线程池中读取数据（避免阻塞）
-                        data = await asyncio.to_thread(
-                            self.recorder.read_output,
-                            4096  # 读取 4KB 数据块
-                        )
-
-                        if data:
-                            # 发送给所有客户端
-                            dead_clients = set()
-                            for client in self.clients:
-                                try:
-                                    client.send(data)
-                                except Exception as e:
-                                    self.logger.warning(f"发送失败，移除客户端: {e}")
-                                    dead_clients.add(client)
-
-                            # 清理断开的客户端
-                            self.clients -= dead_clients
-
-                            # 每 100 个包打印一次统计
-                            log_counter += 1
-                            if log_counter % 100 == 0:
-                                self.logger.debug(f"已转发 {log_counter} 个数据包")
-
-                    except Exception as e:
-                        self.logger.error(f"读取失败: {e}")
-                        await asyncio.sleep(0.1)
-
-                last_client_count = client_count
-                await asyncio.sleep(0.01)
+
+                # 阻塞等待数据并合并小块（定期超时以便重新检查客户端数量）
+                data = read_coalesced(self.recorder, buffer, timeout=_IDLE_CHECK_INTERVAL)
+
+                if data:
+                    # 放入每个客户端的发送队列（由发送线程实际发送）
+                    dead_clients = []
+                    for client, send_queue in list(self.clients.items()):
+                        try:
+                            send_queue.put_nowait(data)
+                        except queue.Full:
+                            dead_clients.append(client)
+
+                    # 清理接收过慢的客户端（发送线程退出时关闭连接）
+                    for client in dead_clients:
+                        send_queue = self._remove_client(client)
+                        if send_queue is not None:
+                            self.logger.warning("客户端接收过慢（发送队列已满），断开连接")
+                            self._stop_sender(send_queue)
+
+                    # 每 100 个包打印一次统计
+                    log_counter += 1
+                    if log_counter % 100 == 0 and self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(f"已转发 {log_counter} 个数据包")
 
         except Exception as e:
             self.logger.error(f"转发循环异常: {e}", exc_info=True)
@@ -202,7 +258,11 @@ class FlaskWebSocketStreamer:
             self._is_running = False
 
     def run(self, host: str = "0.0.0.0", port: int = 8765, debug: bool = False):
-        """运行 Flask 服务器"""
+        """运行 Flask 服务器
+
+        使用 Werkzeug 开发服务器（每个连接一个线程），
+        大量并发连接的场景请使用基于 asyncio 的 WebSocketStreamer
+        """
         self.logger.info(f"启动 Flask WebSocket 服务器，监听 {host}:{port}...")
         self.logger.info(f"WebSocket 端点: ws://{host}:{port}/ws")
 
@@ -218,6 +278,8 @@ class FlaskWebSocketStreamer:
         """停止服务器"""
         self.logger.info("正在关闭 Flask WebSocket 服务器...")
         self._is_running = False
+        # 唤醒可能正在等待客户端的转发线程，使其立即退出
+        self._has_clients.set()
 
         if self.recorder.is_running():
             self.recorder.stop()
@@ -4,12 +4,18 @@ GOP (Group of Pictures) 缓冲模块
 维护最近 1-2 个 GOP 的 FLV 数据，确保新客户端能正确播放
 """
 
+import asyncio
 import logging
-from typing import Optional, List
+import struct
+from typing import Optional
 from collections import deque
 from dataclasses import dataclass
 
 
+# FLV Tag 头前 8 字节：TagType(1) + DataSize(3)，Timestamp(3) + TimestampExtended(1)
+_TAG_HEADER = struct.Struct(">II")
+
+
 @dataclass
 class FLVTag:
     """FLV 标签信息"""
@@ -54,10 +60,20 @@ class GOPBuffer:
         self._metadata_tag: Optional[bytes] = None
 
         # GOP 数据缓存（使用 deque 实现滑动窗口）
-        self._gop_buffer: deque[bytes] = deque(maxlen=max_gop_count)
+        # 完成的 GOP 直接移入窗口（转移缓冲区所有权，不复制）
+        self._gop_buffer: deque[bytearray] = deque(maxlen=max_gop_count)
+
+        # 当前 GOP 累积数据（直接追加到连续缓冲区，避免逐 Tag 保存小对象再拼接）
+        self._current_gop_buf = bytearray()
+        self._current_gop_tags = 0
+
+        # 预先拼接的初始化数据（Header + Metadata 前缀，以及完整结果）
+        # 前缀在 Header/Metadata 捕获后固定；完整结果在 GOP 变化时失效
+        self._initial_prefix: bytes = b''
+        self._initial_data: Optional[bytes] = None
 
-        # 当前 GOP 累积数据
-        self._current_gop: List[bytes] = []
+        # 就绪事件（与 is_ready() 同步，供新客户端等待而不轮询）
+        self._ready_event = asyncio.Event()
 
         # 统计信息
         self._total_bytes = 0
@@ -71,9 +87,13 @@ class GOPBuffer:
         return (
             self._flv_header is not None and
             self._metadata_tag is not None and
-            (len(self._gop_buffer) > 0 or len(self._current_gop) > 0)
+            (len(self._gop_buffer) > 0 or len(self._current_gop_buf) > 0)
         )
 
+    async def wait_ready(self) -> None:
+        """等待缓冲器就绪（已就绪时立即返回）"""
+        await self._ready_event.wait()
+
     def get_initial_data(self) -> bytes:
         """获取新客户端需要的初始化数据
 
@@ -83,38 +103,35 @@ class GOPBuffer:
         if not self.is_ready():
             return b''
 
-        # 组合数据：Header + Metadata + GOPs
-        result = bytearray()
-
-        # 1. FLV Header
-        result.extend(self._flv_header)
-
-        # 2. Metadata Tag（如果有）
-        if self._metadata_tag:
-            result.extend(self._metadata_tag)
+        # GOP 未变化时直接复用上次拼接的结果
+        if self._initial_data is not None:
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    f"为客户端发送初始化数据（缓存命中）: 总大小={len(self._initial_data)} bytes"
+                )
+            return self._initial_data
 
-        # 3. 最近的一个完整 GOP（优先使用已保存的 GOP，否则使用当前正在累积的 GOP）
-        gop_source = "无"
+        # 组合数据：Header + Metadata（预先拼接的前缀） + 最近的一个完整 GOP
+        # 优先使用已保存的 GOP，否则使用当前正在累积的 GOP
         if self._gop_buffer:
             # 取最新的 GOP（最后一个）
-            latest_gop = self._gop_buffer[-1]
-            result.extend(latest_gop)
+            result = self._initial_prefix + self._gop_buffer[-1]
             gop_source = "已保存"
-        elif self._current_gop:
-            # 如果没有已保存的 GOP，使用当前正在累积的 GOP
-            current_gop_data = b''.join(self._current_gop)
-            result.extend(current_gop_data)
+        else:
+            result = self._initial_prefix + self._current_gop_buf
             gop_source = "当前累积"
 
+        self._initial_data = result
+
         self.logger.info(
-            f"为客户端发送初始化数据: "
+            f"为客户端发送初始化数据（重新生成）: "
             f"Header={len(self._flv_header or b'')}, "
             f"Metadata={len(self._metadata_tag or b'')}, "
             f"GOP={gop_source}, "
             f"总大小={len(result)} bytes"
         )
 
-        return bytes(result)
+        return result
 
     def process_data(self, data: bytes) -> tuple[bytes, bytes]:
         """处理 FLV 数据块，提取并缓存 GOP
@@ -177,30 +194,42 @@ class GOPBuffer:
 
         self._tag_buffer.extend(data)
 
-        # 持续解析完整的 Tag
-        while len(self._tag_buffer) >= self.TAG_HEADER_SIZE:
-            # 读取 Tag 头
-            tag_type = self._tag_buffer[0]
-            data_size = int.from_bytes(self._tag_buffer[1:4], byteorder='big')
-            timestamp = int.from_bytes(self._tag_buffer[4:7], byteorder='big')
+        # 持续解析完整的 Tag（通过读取位置前进，不在每个 Tag 后复制剩余数据）
+        buf = self._tag_buffer
+        view = memoryview(buf)
+        pos = 0
+        while len(buf) - pos >= self.TAG_HEADER_SIZE:
+            # 读取 Tag 头（直接从缓冲区解析，不切片复制）
+            type_and_size, ts_and_ext = _TAG_HEADER.unpack_from(buf, pos)
+            tag_type = type_and_size >> 24
+            data_size = type_and_size & 0xFFFFFF
+            # 扩展时间戳字节是 32 位时间戳的最高 8 位
+            timestamp = (ts_and_ext >> 8) | ((ts_and_ext & 0xFF) << 24)
 
             # 计算 Tag 总大小（Tag头 + 数据 + PreviousTagSize）
             tag_total_size = self.TAG_HEADER_SIZE + data_size + 4
 
             # 检查是否有完整的 Tag
-            if len(self._tag_buffer) < tag_total_size:
+            if len(buf) - pos < tag_total_size:
                 break
 
             # 提取完整 Tag
-            tag_data = bytes(self._tag_buffer[:tag_total_size])
-            self._tag_buffer = self._tag_buffer[tag_total_size:]
+            tag_data = view[pos:pos + tag_total_size].tobytes()
+            pos += tag_total_size
 
             # 处理 Tag
             self._handle_tag(tag_type, tag_data, timestamp)
 
         # 返回剩余数据和原始数据（首次捕获时）
-        remaining = bytes(self._tag_buffer)
-        self._tag_buffer.clear()
+        remaining = view[pos:].tobytes()
+        view.release()
+        buf.clear()
+
+        # 就绪状态只会在处理 Tag 时变化，在此同步就绪事件
+        if self.is_ready():
+            self._ready_event.set()
+        else:
+            self._ready_event.clear()
 
         # 首次捕获时，返回原始数据用于广播
         if original_data is not None:
@@ -219,45 +248,69 @@ class GOPBuffer:
         # 18 = Script Data (onMetadata)
         if tag_type == 18 and self._metadata_tag is None:
             self._metadata_tag = tag_data
+            self._initial_prefix = (self._flv_header or b'') + tag_data
+            self._initial_data = None
             self.logger.info(f"✅ Metadata Tag 已捕获: {len(tag_data)} bytes")
             return
 
         # 9 = Video Tag
         if tag_type == 9:
             # 检查是否为关键帧
-            # 视频帧类型在第一个字节的高 4 位
-            frame_type = (tag_data[self.TAG_HEADER_SIZE] & 0xF0) >> 4
-            is_keyframe = (frame_type == 1)  # 1 = keyframe (I-frame)
+            # 视频帧类型在第一个字节的高 4 位，1 = keyframe (I-frame)，即该字节位于 0x10-0x1F
+            is_keyframe = 0x10 <= tag_data[11] < 0x20
 
             if is_keyframe:
                 # 遇到新的关键帧，保存当前 GOP
-                if self._current_gop:
-                    gop_data = b''.join(self._current_gop)
+                if self._current_gop_buf:
+                    gop_data = self._current_gop_buf
+                    self._current_gop_buf = bytearray()
                     self._gop_buffer.append(gop_data)
-                    self.logger.debug(
-                        f"保存 GOP #{len(self._gop_buffer)}: "
-                        f"{len(gop_data)} bytes, {len(self._current_gop)} tags"
-                    )
+                    self._initial_data = None
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(
+                            f"保存 GOP #{len(self._gop_buffer)}: "
+                            f"{len(gop_data)} bytes, {self._current_gop_tags} tags"
+                        )
 
                 # 开始新的 GOP
-                self._current_gop = [tag_data]
+                self._current_gop_buf[:] = tag_data
+                self._current_gop_tags = 1
+                if not self._gop_buffer:
+                    self._initial_data = None
             else:
                 # 非关键帧，添加到当前 GOP
-                if self._current_gop:
-                    self._current_gop.append(tag_data)
+                if self._current_gop_buf:
+                    self._append_to_current_gop(tag_data)
 
         # 8 = Audio Tag
         elif tag_type == 8:
             # 音频帧添加到当前 GOP
-            if self._current_gop:
-                self._current_gop.append(tag_data)
+            if self._current_gop_buf:
+                self._append_to_current_gop(tag_data)
+
+    def _append_to_current_gop(self, tag_data: bytes) -> None:
+        """追加 Tag 到当前 GOP
+
+        尚无已保存的 GOP 时，初始化数据取自当前 GOP，需要使缓存失效
+
+        Args:
+            tag_data: 完整的 Tag 数据
+        """
+        self._current_gop_buf += tag_data
+        self._current_gop_tags += 1
+        if not self._gop_buffer:
+            self._initial_data = None
 
     def reset(self) -> None:
         """重置缓冲器（FFmpeg 重启时调用）"""
         self._flv_header = None
         self._metadata_tag = None
         self._gop_buffer.clear()
-        self._current_gop.clear()
+        self._current_gop_buf.clear()
+        self._current_gop_tags = 0
+        self._initial_prefix = b''
+        self._initial_data = None
+        self._ready_event.clear()
         self._total_bytes = 0
 
         if hasattr(self, '_process_buffer'):
@@ -280,6 +333,6 @@ class GOPBuffer:
             "metadata_ready": self._metadata_tag is not None,
             "metadata_size": len(self._metadata_tag) if self._metadata_tag else 0,
             "gop_count": len(self._gop_buffer),
-            "current_gop_tags": len(self._current_gop),
+            "current_gop_tags": self._current_gop_tags,
             "ready": self.is_ready()
         }
@@ -6,8 +6,9 @@
 """
 
 import asyncio
+import concurrent.futures
 import logging
-from typing import Optional
+from typing import Dict, Optional, Set
 from aiohttp import web
 import websockets
 from websockets.server import WebSocketServerProtocol
@@ -15,6 +16,18 @@ from websockets.server import WebSocketServerProtocol
 from src.recorder.base_recorder import BaseRecorder
 from src.streamer.client_manager import ClientManager
 from src.config.config_parser import ConfigData
+from src.streamer.output_reader import OutputReader
+from src.streamer.io_executor import install_io_executor, release_io_executor
+
+
+# 单个 WebSocket 客户端发送一块数据的超时时间（秒），超时视为接收过慢
+_WS_SEND_TIMEOUT = 1.0
+
+# 发送超时关闭连接使用的关闭码（1013: Try Again Later）
+_SLOW_CLIENT_CLOSE_CODE = 1013
+
+# 所有客户端断开后关闭 FFmpeg 的等待时间（秒）
+_NO_CLIENT_TIMEOUT = 30
 
 
 class HybridStreamer:
@@ -43,17 +56,34 @@ class HybridStreamer:
         self.site: Optional[web.TCPSite] = None
 
         # WebSocket 相关
-        self.ws_clients: list = []
+        self.ws_clients: Set[WebSocketServerProtocol] = set()
         self.ws_server: Optional[websockets.WebSocketServer] = None
+        self._closing_tasks: set = set()  # 正在关闭的慢客户端连接（保持任务引用）
 
         # 流转发
-        self.http_clients: set = set()
-        self.streaming = False
+        # HTTP 响应 -> 连接断开事件（由转发循环在写入失败时设置）
+        self.http_clients: Dict[web.StreamResponse, asyncio.Event] = {}
+        self._reader = OutputReader(recorder, logger)
+        self._stream_task: Optional[asyncio.Task] = None
+
+        # 延迟关闭 FFmpeg 的任务（同一时间最多一个，新客户端连接时取消）
+        self._shutdown_task: Optional[asyncio.Task] = None
+
+        # 服务器是否正在停止（停止期间不再计划延迟关闭）
+        self._stopping = False
+
+        # asyncio.to_thread() 使用的专用线程池（start() 中设为事件循环的默认执行器）
+        self._io_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
 
         self.logger.info("混合流媒体服务器已初始化")
 
     async def start(self) -> None:
         """启动 HTTP 和 WebSocket 服务器"""
+        self._stopping = False
+
+        # 阻塞操作（FFmpeg 启动/停止）使用有界的专用线程池
+        self._io_pool = install_io_executor("flv-io")
+
         # 启动 HTTP 服务器
         self.logger.info(
             f"正在启动 HTTP 服务器，监听 {self.config.host}:8080..."
@@ -77,14 +107,17 @@ class HybridStreamer:
         self.ws_server = await websockets.serve(
             self.handle_ws_client,
             self.config.host,
-            8765
+            8765,
+            # FLV 视频数据已压缩，禁用 permessage-deflate，避免逐客户端重复压缩
+            compression=None
         )
         self.logger.info(
             f"✅ WebSocket 服务器已启动，监听 {self.config.host}:8765"
         )
 
-        # 启动流转发任务
-        asyncio.create_task(self.stream_loop())
+        # 启动输出读取线程和流转发任务
+        self._reader.start()
+        self._stream_task = asyncio.create_task(self.stream_loop())
 
         self.logger.info("⚠️  FFmpeg 未启动，等待客户端连接...")
 
@@ -92,8 +125,20 @@ class HybridStreamer:
         """停止所有服务"""
         self.logger.info("正在关闭混合流媒体服务器...")
 
+        # 标记正在停止：关闭连接时客户端断开不再计划延迟关闭
+        self._stopping = True
+
+        # 取消待执行的延迟关闭
+        self._cancel_shutdown()
+
         # 停止流转发
-        self.streaming = False
+        if self._stream_task and not self._stream_task.done():
+            self._stream_task.cancel()
+            try:
+                await self._stream_task
+            except asyncio.CancelledError:
+                pass
+        self._reader.stop()
 
         # 停止 FFmpeg
         if self.recorder.is_running():
@@ -108,11 +153,17 @@ class HybridStreamer:
             self.ws_server.close()
             await self.ws_server.wait_closed()
 
+        # 关闭专用线程池（先解除与事件循环的关联）
+        if self._io_pool:
+            release_io_executor(self._io_pool)
+            self._io_pool = None
+
         self.logger.info("混合流媒体服务器已关闭")
 
     async def handle_http_flv(self, request: web.Request) -> web.Response:
         """处理 HTTP-FLV 请求（flv.js 标准方式）"""
         self.logger.info("📡 HTTP-FLV 客户端连接")
+        self._cancel_shutdown()
 
         # 启动 FFmpeg（如果未运行）
         if not self.recorder.is_running():
@@ -131,44 +182,36 @@ class HybridStreamer:
         )
         await response.prepare(request)
 
-        # 添加到客户端集合
-        self.http_clients.add(response)
+        # 添加到客户端集合（数据由转发循环统一写入）
+        closed = asyncio.Event()
+        self.http_clients[response] = closed
         self.logger.info(f"HTTP-FLV 客户端已添加，当前客户端数: {len(self.http_clients)}")
 
         try:
-            # 持续发送数据
-            while True:
-                data = await asyncio.to_thread(self.recorder.read_output, 8192)
-                if data:
-                    await response.write(data)
-                else:
-                    await asyncio.sleep(0.01)
-        except (ConnectionResetError, ConnectionAbortedError):
+            # 等待转发循环发现连接断开
+            await closed.wait()
             self.logger.info("HTTP-FLV 客户端断开")
         finally:
-            self.http_clients.discard(response)
+            self.http_clients.pop(response, None)
             self.logger.info(
                 f"HTTP-FLV 客户端已移除，剩余客户端: {len(self.http_clients)}"
             )
 
             # 如果没有客户端了，计划关闭
-            if len(self.http_clients) == 0:
-                self.logger.info("所有客户端已断开，30秒后将关闭 FFmpeg...")
-                await asyncio.sleep(30)
-                if len(self.http_clients) == 0 and self.recorder.is_running():
-                    await asyncio.to_thread(self.recorder.stop)
+            self._schedule_shutdown()
 
         return response
 
     async def handle_ws_client(self, websocket: WebSocketServerProtocol, path: str = "") -> None:
         """处理 WebSocket 客户端（备用）"""
         self.logger.info("📡 WebSocket 客户端连接")
+        self._cancel_shutdown()
 
         # 启动 FFmpeg（如果未运行）
         if not self.recorder.is_running():
             await asyncio.to_thread(self.recorder.start)
 
-        self.ws_clients.append(websocket)
+        self.ws_clients.add(websocket)
         self.logger.info(
             f"WebSocket 客户端已添加，当前客户端数: {len(self.ws_clients)}"
         )
@@ -176,30 +219,81 @@ class HybridStreamer:
         try:
             await websocket.wait_closed()
         finally:
-            self.ws_clients.remove(websocket)
+            self.ws_clients.discard(websocket)
             self.logger.info(
                 f"WebSocket 客户端已移除，剩余客户端: {len(self.ws_clients)}"
             )
 
+            # 如果没有客户端了，计划关闭
+            self._schedule_shutdown()
+
+    def _schedule_shutdown(self) -> None:
+        """所有客户端断开后，计划延迟关闭 FFmpeg（已有计划时不重复创建）"""
+        # 服务器停止过程中由 stop() 负责关闭 FFmpeg
+        if self._stopping:
+            return
+        if self.http_clients or self.ws_clients:
+            return
+        if self._shutdown_task is not None and not self._shutdown_task.done():
+            return
+
+        self.logger.info(f"所有客户端已断开，{_NO_CLIENT_TIMEOUT}秒后将关闭 FFmpeg...")
+        self._shutdown_task = asyncio.create_task(self._delayed_stop(_NO_CLIENT_TIMEOUT))
+
+    def _cancel_shutdown(self) -> None:
+        """取消计划中的延迟关闭（有新客户端连接）"""
+        if self._shutdown_task is not None and not self._shutdown_task.done():
+            self._shutdown_task.cancel()
+        self._shutdown_task = None
+
+    async def _delayed_stop(self, delay: float) -> None:
+        """等待一段时间后，如果仍没有客户端则关闭 FFmpeg
+
+        Args:
+            delay: 等待时间（秒）
+        """
+        await asyncio.sleep(delay)
+        if not self.http_clients and not self.ws_clients and self.recorder.is_running():
+            self.logger.info("超时到达，关闭 FFmpeg...")
+            await asyncio.to_thread(self.recorder.stop)
+
     async def stream_loop(self) -> None:
-        """流转发循环（仅用于 WebSocket）"""
+        """流转发循环：等待读取线程送来的数据，分发给所有 HTTP/WebSocket 客户端"""
         while True:
-            # 只在有 HTTP 客户端时启动 FFmpeg
-            if len(self.http_clients) > 0 and not self.recorder.is_running():
-                await asyncio.to_thread(self.recorder.start)
+            data = await self._reader.get()
 
-            # 读取数据并发送给 WebSocket 客户端
-            if len(self.ws_clients) > 0 and self.recorder.is_running():
+            # 发送给所有 HTTP-FLV 客户端
+            for response, closed in list(self.http_clients.items()):
                 try:
-                    data = await asyncio.to_thread(self.recorder.read_output, 8192)
-                    if data:
-                        # 发送给所有 WebSocket 客户端
-                        for ws in self.ws_clients[:]:  # 创建副本
-                            try:
-                                await ws.send(data)
-                            except Exception:
-                                self.ws_clients.remove(ws)
-                except Exception as e:
-                    self.logger.error(f"流转发错误: {e}")
-
-            await asyncio.sleep(0.01)
+                    await response.write(data)
+                except Exception:
+                    self.http_clients.pop(response, None)
+                    closed.set()
+
+            # 并发发送给所有 WebSocket 客户端（耗时取决于最慢的客户端，而不是所有客户端之和）
+            # 协程列表在等待前创建，连接处理协程之后增删集合不影响本次发送
+            if self.ws_clients:
+                await asyncio.gather(
+                    *[self._safe_send(ws, data) for ws in self.ws_clients],
+                    return_exceptions=True
+                )
+
+    async def _safe_send(self, ws: WebSocketServerProtocol, data: bytes) -> None:
+        """发送数据给单个 WebSocket 客户端，失败或超时则移除该客户端
+
+        Args:
+            ws: WebSocket 连接
+            data: 要发送的数据
+        """
+        try:
+            await asyncio.wait_for(ws.send(data), timeout=_WS_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.ws_clients.discard(ws)
+            self.logger.warning("WebSocket 客户端接收过慢，断开连接")
+
+            # 关闭连接，使连接处理协程的 wait_closed() 返回
+            task = asyncio.create_task(ws.close(_SLOW_CLIENT_CLOSE_CODE, "client too slow"))
+            self._closing_tasks.add(task)
+            task.add_done_callback(self._closing_tasks.discard)
+        except Exception:
+            self.ws_clients.discard(ws)
@@ -0,0 +1,46 @@
+"""
+阻塞操作专用线程池
+
+为推流服务器中的 asyncio.to_thread() 调用（FFmpeg 启动/停止）提供有界的默认执行器
+"""
+
+import asyncio
+import concurrent.futures
+
+
+# 阻塞操作（FFmpeg 启动/停止）专用线程池的线程数
+_IO_POOL_SIZE = 2
+
+
+def install_io_executor(thread_name_prefix: str) -> concurrent.futures.ThreadPoolExecutor:
+    """创建有界的专用线程池，并设为当前事件循环的默认执行器
+
+    避免阻塞操作与其他组件争用默认执行器
+
+    Args:
+        thread_name_prefix: 线程名前缀
+
+    Returns:
+        ThreadPoolExecutor: 专用线程池（停止时交给 release_io_executor() 释放）
+    """
+    pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=_IO_POOL_SIZE,
+        thread_name_prefix=thread_name_prefix
+    )
+    asyncio.get_running_loop().set_default_executor(pool)
+    return pool
+
+
+def release_io_executor(pool: concurrent.futures.ThreadPoolExecutor) -> None:
+    """解除专用线程池与事件循环的关联后关闭线程池
+
+    先换上新的默认执行器（按需创建线程，随事件循环关闭），
+    之后仍在执行的任务调用 asyncio.to_thread() 不会因线程池已关闭而失败
+
+    Args:
+        pool: install_io_executor() 返回的线程池
+    """
+    asyncio.get_running_loop().set_default_executor(
+        concurrent.futures.ThreadPoolExecutor()
+    )
+    pool.shutdown(wait=False)
@@ -0,0 +1,160 @@
+"""
+录制输出读取器
+
+在独立线程中阻塞读取录制器输出，通过 asyncio.Queue 交给事件循环中的转发协程
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+import logging
+from typing import Optional
+
+from src.recorder.base_recorder import BaseRecorder
+
+
+# 合并输出的上限（字节）和最长等待时间（秒）
+_COALESCE_MAX_BYTES = 65536
+_COALESCE_MAX_WAIT = 0.02
+
+# 读取线程等待数据或队列空位的超时时间（秒），决定响应停止请求的速度
+_POLL_TIMEOUT = 0.1
+
+# 事件循环侧队列最多缓存的数据块数量
+_QUEUE_SIZE = 32
+
+
+def read_coalesced(
+    recorder: BaseRecorder,
+    buffer: bytearray,
+    max_wait: float = _COALESCE_MAX_WAIT,
+    timeout: float = _POLL_TIMEOUT
+) -> bytes:
+    """阻塞读取录制输出，并合并 max_wait 秒内陆续到达的数据
+
+    数据直接写入调用方复用的暂存缓冲区，最后只复制一次生成返回的 bytes
+    （返回值会被多个客户端共享并异步发送，不能直接使用暂存缓冲区）
+
+    Args:
+        recorder: 录制器实例
+        buffer: 暂存缓冲区（长度即单块最多合并的字节数），由调用方跨次复用
+        max_wait: 收到第一块数据后继续合并的最长时间（秒）
+        timeout: 等待第一块数据的超时时间（秒）
+
+    Returns:
+        bytes: 合并后的数据，超时仍无数据返回空字节
+    """
+    view = memoryview(buffer)
+    size = len(view)
+
+    n = recorder.read_output_into(view, timeout=timeout)
+    if n and n < size:
+        deadline = time.monotonic() + max_wait
+        while n < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            n += recorder.read_output_into(view[n:], timeout=remaining)
+
+    return view[:n].tobytes() if n else b''
+
+
+class OutputReader:
+    """录制输出读取器
+
+    职责：
+    1. 在后台线程中阻塞读取录制器输出（无数据时不轮询）
+    2. 合并短时间内陆续到达的小块数据，减少下游发送次数
+    3. 通过有界 asyncio.Queue 交给事件循环（队列满时读取线程等待，形成反压）
+    """
+
+    def __init__(
+        self,
+        recorder: BaseRecorder,
+        logger: logging.Logger,
+        max_bytes: int = _COALESCE_MAX_BYTES,
+        max_wait: float = _COALESCE_MAX_WAIT
+    ):
+        """初始化读取器
+
+        Args:
+            recorder: 录制器实例
+            logger: 日志记录器
+            max_bytes: 单个数据块最多合并的字节数
+            max_wait: 合并数据的最长等待时间（秒）
+        """
+        self.recorder = recorder
+        self.logger = logger
+        self.max_bytes = max_bytes
+        self.max_wait = max_wait
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self) -> None:
+        """启动读取线程（必须在事件循环中调用，数据投递到当前事件循环）"""
+        if self._thread is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+
+        # 每次启动使用新的停止事件，避免与尚未退出的旧线程互相影响
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(loop, self._queue, self._stop_event),
+            name="OutputReader",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """通知读取线程退出（不等待，线程最多在 _POLL_TIMEOUT 秒内退出）"""
+        self._stop_event.set()
+        self._thread = None
+
+    async def get(self) -> bytes:
+        """等待并取出下一块数据
+
+        Returns:
+            bytes: 录制输出数据
+        """
+        return await self._queue.get()
+
+    def _run(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        out_queue: asyncio.Queue,
+        stop_event: threading.Event
+    ) -> None:
+        """读取线程主循环
+
+        Args:
+            loop: 接收数据的事件循环
+            out_queue: 事件循环侧的数据队列
+            stop_event: 停止事件
+        """
+        # 读取线程独占的暂存缓冲区（跨次复用，不为每次读取分配）
+        buffer = bytearray(self.max_bytes)
+
+        try:
+            while not stop_event.is_set():
+                data = read_coalesced(self.recorder, buffer, self.max_wait)
+                if not data:
+                    continue
+
+                # 投递到事件循环；队列满时等待空位，同时保持对停止请求的响应
+                future = asyncio.run_coroutine_threadsafe(out_queue.put(data), loop)
+                while True:
+                    try:
+                        future.result(timeout=_POLL_TIMEOUT)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        if stop_event.is_set():
+                            future.cancel()
+                            return
+        except Exception as e:
+            self.logger.error(f"读取录制输出失败: {e}")
@@ -8,6 +8,10 @@ from typing import Dict, Tuple, Optional
 import logging
 
 
+# 端口不存在时使用的空路由表（只读）
+_EMPTY_PATHS: Dict[str, str] = {}
+
+
 class WebSocketRouter:
     """WebSocket 路由器
 
@@ -20,11 +24,8 @@ class WebSocketRouter:
         Args:
             logger: 日志记录器
         """
-        # 路由表：{(port, path): instance_name}
-        self.routes: Dict[Tuple[int, str], str] = {}
-
-        # 索引：{port: [paths]}
-        self._port_index: Dict[int, list] = {}
+        # 路由表：{port: {path: instance_name}}（按端口分组，查找无需构造元组键）
+        self.routes: Dict[int, Dict[str, str]] = {}
 
         self.logger = logger or logging.getLogger(__name__)
 
@@ -39,19 +40,14 @@ class WebSocketRouter:
         Raises:
             ValueError: 路由已存在
         """
-        key = (port, path)
+        paths = self.routes.setdefault(port, {})
 
-        if key in self.routes:
+        if path in paths:
             raise ValueError(
-                f"路由已存在: {port}{path}（已被实例 '{self.routes[key]}' 占用）"
+                f"路由已存在: {port}{path}（已被实例 '{paths[path]}' 占用）"
             )
 
-        self.routes[key] = instance_name
-
-        # 更新端口索引
-        if port not in self._port_index:
-            self._port_index[port] = []
-        self._port_index[port].append(path)
+        paths[path] = instance_name
 
         self.logger.info(f"添加路由: {port}{path} -> {instance_name}")
 
@@ -65,17 +61,15 @@ class WebSocketRouter:
         Returns:
             bool: 是否成功移除
         """
-        key = (port, path)
-
-        if key not in self.routes:
+        paths = self.routes.get(port)
+        if not paths or path not in paths:
             return False
 
-        instance_name = self.routes[key]
-        del self.routes[key]
+        instance_name = paths.pop(path)
 
-        # 更新端口索引
-        if port in self._port_index and path in self._port_index[port]:
-            self._port_index[port].remove(path)
+        # 端口下已无路由时移除该端口
+        if not paths:
+            del self.routes[port]
 
         self.logger.info(f"移除路由: {port}{path} -> {instance_name}")
         return True
@@ -90,8 +84,7 @@ class WebSocketRouter:
         Returns:
             Optional[str]: 实例名称，不存在返回 None
         """
-        key = (port, path)
-        return self.routes.get(key)
+        return self.routes.get(port, _EMPTY_PATHS).get(path)
 
     def get_all_paths(self, port: int) -> list:
         """获取指定端口的所有路径
@@ -102,15 +95,19 @@ class WebSocketRouter:
         Returns:
             list: 路径列表
         """
-        return self._port_index.get(port, []).copy()
+        return list(self.routes.get(port, _EMPTY_PATHS))
 
     def get_all_routes(self) -> Dict[Tuple[int, str], str]:
         """获取所有路由
 
         Returns:
-            Dict[Tuple[int, str], str]: 路由表副本
+            Dict[Tuple[int, str], str]: 路由表副本，键为 (port, path)
         """
-        return self.routes.copy()
+        return {
+            (port, path): instance_name
+            for port, paths in self.routes.items()
+            for path, instance_name in paths.items()
+        }
 
     def clear_port(self, port: int) -> int:
         """清除指定端口的所有路由
@@ -121,17 +118,7 @@ class WebSocketRouter:
         Returns:
             int: 清除的路由数量
         """
-        count = 0
-
-        # 收集要删除的键
-        keys_to_delete = [
-            (p, path) for (p, path) in self.routes.keys() if p == port
-        ]
-
-        # 删除路由
-        for key in keys_to_delete:
-            self.remove_route(key[0], key[1])
-            count += 1
+        count = len(self.routes.pop(port, _EMPTY_PATHS))
 
         self.logger.info(f"清除端口 {port} 的 {count} 个路由")
         return count
@@ -146,7 +133,7 @@ class WebSocketRouter:
         Returns:
             bool: 路由是否存在
         """
-        return (port, path) in self.routes
+        return path in self.routes.get(port, _EMPTY_PATHS)
 
     def get_instance_count(self, port: int) -> int:
         """获取指定端口的实例数量
@@ -157,4 +144,4 @@ class WebSocketRouter:
         Returns:
             int: 实例数量
         """
-        return len(self._port_index.get(port, []))
+        return len(self.routes.get(port, _EMPTY_PATHS))
@@ -11,6 +11,12 @@ from typing import Optional
 from src.recorder.base_recorder import BaseRecorder
 from src.streamer.client_manager import ClientManager
 from src.streamer.gop_buffer import GOPBuffer
+from src.streamer.output_reader import OutputReader
+
+
+# 单次合并读取的字节数下限与默认值（块过小会产生大量读取和事件循环调度）
+_MIN_READ_CHUNK_SIZE = 65536
+_DEFAULT_READ_CHUNK_SIZE = 262144
 
 
 class StreamForwarder:
@@ -26,7 +32,8 @@ class StreamForwarder:
         self,
         recorder: BaseRecorder,
         client_manager: ClientManager,
-        logger: logging.Logger
+        logger: logging.Logger,
+        read_chunk_size: int = _DEFAULT_READ_CHUNK_SIZE
     ):
         """初始化转发器
 
@@ -34,6 +41,7 @@ class StreamForwarder:
             recorder: 录制器对象
             client_manager: 客户端管理器
             logger: 日志记录器
+            read_chunk_size: 单次读取 FFmpeg 输出的最大字节数
         """
         self.recorder = recorder
         self.client_manager = client_manager
@@ -42,6 +50,11 @@ class StreamForwarder:
         # GOP 缓冲器（缓存最近 1-2 个 GOP 的数据）
         self.gop_buffer = GOPBuffer(logger, max_gop_count=2)
 
+        # 输出读取器（后台线程阻塞读取 FFmpeg 输出，转发任务只需等待数据到达）
+        self._reader = OutputReader(
+            recorder, logger, max_bytes=max(_MIN_READ_CHUNK_SIZE, read_chunk_size)
+        )
+
         # 转发任务
         self._forwarding_task: Optional[asyncio.Task] = None
         self._is_running = False
@@ -65,7 +78,8 @@ class StreamForwarder:
 
         self.logger.info("启动流转发器...")
 
-        # 创建转发任务
+        # 启动读取线程和转发任务
+        self._reader.start()
         self._forwarding_task = asyncio.create_task(
             self._read_and_forward()
         )
@@ -87,6 +101,8 @@ class StreamForwarder:
             except asyncio.CancelledError:
                 pass
 
+        self._reader.stop()
+
         # 根据参数决定是否重置GOP缓冲区
         if reset_gop_buffer:
             self.gop_buffer.reset()
@@ -101,21 +117,8 @@ class StreamForwarder:
         """读取 FFmpeg 输出并转发给客户端"""
         try:
             while self._is_running:
-                # 读取录制器输出（始终读取，即使没有客户端也需要填充 GOP 缓冲）
-                try:
-                    data = await asyncio.to_thread(
-                        self.recorder.read_output,
-                        8192  # 读取 8KB 数据块
-                    )
-                except Exception as e:
-                    self.logger.error(f"读取录制器输出失败: {e}")
-                    await asyncio.sleep(0.1)
-                    continue
-
-                # 如果没有数据，等待一小段时间
-                if not data:
-                    await asyncio.sleep(0.01)
-                    continue
+                # 等待读取线程送来的数据（始终读取，即使没有客户端也需要填充 GOP 缓冲）
+                data = await self._reader.get()
 
                 # 处理 GOP 缓存
                 _, stream_data = self.gop_buffer.process_data(data)
@@ -132,8 +135,8 @@ class StreamForwarder:
                     # 这样在超时期间，GOP 缓冲区仍然可用
                     pass
 
-                # 定期打印统计（每 1000 个包）
-                if self._packet_count % 1000 == 0:
+                # 定期打印统计（每 1000 个包，仅在启用 DEBUG 日志时收集）
+                if self._packet_count % 1000 == 0 and self.logger.isEnabledFor(logging.DEBUG):
                     stats = self.gop_buffer.get_statistics()
                     self.logger.debug(
                         f"转发统计: 包数={self._packet_count}, "
@@ -150,44 +153,39 @@ class StreamForwarder:
         except Exception as e:
             self.logger.error(f"转发循环异常: {e}", exc_info=True)
 
-    async def send_initial_data_to_client(self, client_id: str) -> bool:
-        """向指定客户端发送初始化数据（FLV Header + Metadata + GOP）
+    def register_and_prime(
+        self,
+        client_id: str,
+        websocket: 'WebSocketServerProtocol'
+    ) -> bool:
+        """注册客户端，并把初始化数据（FLV Header + Metadata + GOP）排在其发送队列最前
+
+        注册与放入初始化数据一步完成，保证初始化数据先于任何广播数据发出
 
         Args:
             client_id: 客户端 ID
+            websocket: WebSocket 连接对象
 
         Returns:
-            bool: 发送是否成功
+            bool: 初始化数据是否已放入发送队列（GOP 未就绪时仅注册客户端）
         """
-        if not self.gop_buffer.is_ready():
-            self.logger.warning(
-                f"GOP 缓冲未就绪，无法发送给客户端 {client_id}"
-            )
-            return False
-
         initial_data = self.gop_buffer.get_initial_data()
-        if not initial_data:
-            return False
-
-        try:
-            conn_info = self.client_manager.get_client(client_id)
-            if not conn_info:
-                self.logger.warning(f"客户端 {client_id} 不存在")
-                return False
-
-            await conn_info.websocket.send(initial_data)
-            self.logger.info(
-                f"✅ 初始化数据已发送给客户端 {client_id} "
-                f"({len(initial_data)} bytes)"
-            )
-            return True
+        self.client_manager.add_client(
+            client_id, websocket, initial_data=initial_data or None
+        )
 
-        except Exception as e:
-            self.logger.error(
-                f"发送初始化数据到客户端 {client_id} 失败: {e}"
+        if not initial_data:
+            self.logger.warning(
+                f"GOP 缓冲未就绪，无法发送初始化数据给客户端 {client_id}"
             )
             return False
 
+        self.logger.info(
+            f"✅ 初始化数据已放入客户端 {client_id} 的发送队列 "
+            f"({len(initial_data)} bytes)"
+        )
+        return True
+
     async def _forward_to_client(
         self,
         client_id: str,
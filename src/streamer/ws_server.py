@@ -5,6 +5,7 @@ WebSocket 推流服务器
 """
 
 import asyncio
+import concurrent.futures
 import logging
 from typing import Optional
 
@@ -15,6 +16,7 @@ from src.recorder.base_recorder import BaseRecorder
 from src.streamer.client_manager import ClientManager
 from src.streamer.stream_forwarder import StreamForwarder
 from src.config.config_parser import ConfigData
+from src.streamer.io_executor import install_io_executor, release_io_executor
 
 
 class WebSocketStreamer:
@@ -67,10 +69,21 @@ class WebSocketStreamer:
         # 标记FFmpeg是否已经启动过（用来区分是否是真正的第一次连接）
         self._ffmpeg_started = False
 
+        # 服务器是否正在停止
+        self._stopping = False
+
+        # asyncio.to_thread() 使用的专用线程池（start() 中设为事件循环的默认执行器）
+        self._io_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
         self.logger.info("WebSocket 推流服务器已初始化")
 
     async def start(self) -> None:
         """启动 WebSocket 服务器"""
+        self._stopping = False
+
+        # 阻塞操作（FFmpeg 启动/停止）使用有界的专用线程池
+        self._io_pool = install_io_executor("ws-io")
+
         self.logger.info(
             f"正在启动 WebSocket 服务器，"
             f"监听 {self.config.host}:{self.config.server_port}..."
@@ -80,7 +93,9 @@ class WebSocketStreamer:
         self.server = await websockets.serve(
             self._handle_client,
             self.config.host,
-            self.config.server_port
+            self.config.server_port,
+            # FLV 视频数据已压缩，禁用 permessage-deflate，避免逐客户端重复压缩
+            compression=None
         )
 
         self.logger.info(
@@ -93,6 +108,9 @@ class WebSocketStreamer:
         """停止 WebSocket 服务器"""
         self.logger.info("正在关闭 WebSocket 服务器...")
 
+        # 标记正在停止：关闭连接时客户端断开不再计划延迟关闭
+        self._stopping = True
+
         # 取消关闭定时器
         if self._shutdown_task and not self._shutdown_task.done():
             self._shutdown_task.cancel()
@@ -111,6 +129,11 @@ class WebSocketStreamer:
             self.server.close()
             await self.server.wait_closed()
 
+        # 关闭专用线程池（先解除与事件循环的关联）
+        if self._io_pool:
+            release_io_executor(self._io_pool)
+            self._io_pool = None
+
         self.logger.info("WebSocket 服务器已关闭")
 
     async def _handle_client(
@@ -152,19 +175,14 @@ class WebSocketStreamer:
                     # 等待 GOP 缓冲就绪
                     await self._wait_for_gop_ready()
 
-                    # GOP 就绪后，添加客户端
-                    self.client_manager.add_client(client_id, websocket)
+                    # GOP 就绪后，添加客户端，初始化数据（Header + Metadata + GOP）排在最前
+                    if self.stream_forwarder:
+                        self.stream_forwarder.register_and_prime(client_id, websocket)
+                    else:
+                        self.client_manager.add_client(client_id, websocket)
                     self.logger.info(
                         f"当前客户端数: {self.client_manager.get_client_count()}"
                     )
-
-                    # 先发送初始化数据（Header + Metadata + GOP）
-                    if self.stream_forwarder:
-                        success = await self.stream_forwarder.send_initial_data_to_client(client_id)
-                        if success:
-                            self.logger.info(f"✅ 初始化数据已发送给客户端 {client_id}")
-                        else:
-                            self.logger.warning(f"⚠️ 初始化数据发送失败给客户端 {client_id}")
                 else:
                     # FFmpeg不在运行，这是一个新的第一个客户端
                     self.logger.info("第一个客户端连接，启动 FFmpeg 并直接推流")
@@ -227,7 +245,8 @@ class WebSocketStreamer:
             self.stream_forwarder = StreamForwarder(
                 recorder=self.recorder,
                 client_manager=self.client_manager,
-                logger=self.logger
+                logger=self.logger,
+                read_chunk_size=self.config.read_chunk_size
             )
             await self.stream_forwarder.start_forwarding()
 
@@ -246,16 +265,16 @@ class WebSocketStreamer:
         if not self.stream_forwarder:
             return
 
-        start_time = asyncio.get_event_loop().time()
-
-        while not self.stream_forwarder.gop_buffer.is_ready():
-            if asyncio.get_event_loop().time() - start_time > timeout:
-                self.logger.warning(
-                    f"等待 GOP 缓冲超时 ({timeout}秒)，客户端可能无法播放"
-                )
-                return
-
-            await asyncio.sleep(0.1)
+        try:
+            # 缓冲就绪时由 GOPBuffer 触发事件，无需轮询
+            await asyncio.wait_for(
+                self.stream_forwarder.gop_buffer.wait_ready(), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                f"等待 GOP 缓冲超时 ({timeout}秒)，客户端可能无法播放"
+            )
+            return
 
         stats = self.stream_forwarder.gop_buffer.get_statistics()
         self.logger.info(
@@ -270,6 +289,10 @@ class WebSocketStreamer:
 
         最后一个客户端断开后调用，等待超时时间后关闭
         """
+        # 服务器停止过程中由 stop() 负责关闭 FFmpeg
+        if self._stopping:
+            return
+
         timeout = self.config.shutdown_timeout
         self.logger.info(
             f"⏳ 所有客户端已断开，{timeout} 秒后将关闭 FFmpeg..."
@@ -4,26 +4,55 @@ Windows 托盘应用
 提供 Windows 系统托盘图标和右键菜单功能
 """
 
+import functools
 import logging
-import threading
-from typing import Optional, Callable
-from pathlib import Path
+from collections import Counter
+from typing import Optional
 
 try:
-    import pystray
-    from PIL import Image, ImageDraw
-    PYSTRAY_AVAILABLE = True
+    from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction
+    from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QPen
+    PYQT_AVAILABLE = True
 except ImportError:
-    PYSTRAY_AVAILABLE = False
+    PYQT_AVAILABLE = False
 
 from src.config.config_manager import ConfigManager
 from src.instance.instance_manager import InstanceManager
 
 
+@functools.lru_cache(maxsize=4)
+def _get_icon_image(size: int) -> "QIcon":
+    """绘制托盘图标（图标固定不变，按尺寸缓存，需在 QApplication 创建后调用）
+
+    Args:
+        size: 图标大小
+
+    Returns:
+        QIcon: 图标
+    """
+    # 创建一个简单的蓝色圆形图标
+    pixmap = QPixmap(size, size)
+    pixmap.fill(QColor(255, 255, 255))
+
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+
+    # 绘制圆形
+    margin = 4
+    painter.setPen(QPen(QColor(255, 255, 255), 2))
+    painter.setBrush(QColor(33, 150, 243))  # Material Blue
+    painter.drawEllipse(margin, margin, size - 2 * margin, size - 2 * margin)
+    painter.end()
+
+    return QIcon(pixmap)
+
+
 class TrayApp:
     """Windows 托盘应用
 
     提供系统托盘图标和右键菜单功能
+
+    托盘图标使用 QSystemTrayIcon，与主窗口共用 Qt 事件循环（需在主线程中使用）
     """
 
     def __init__(
@@ -39,15 +68,16 @@ class TrayApp:
             instance_manager: 实例管理器
             logger: 日志记录器
         """
-        if not PYSTRAY_AVAILABLE:
-            raise RuntimeError("pystray 库未安装，请运行: pip install pystray")
+        if not PYQT_AVAILABLE:
+            raise RuntimeError("PyQt5 库未安装，请运行: pip install PyQt5")
 
         self.config_manager = config_manager
         self.instance_manager = instance_manager
         self.logger = logger or logging.getLogger(__name__)
 
         # 托盘图标
-        self.icon: Optional[pystray.Icon] = None
+        self.icon: Optional[QSystemTrayIcon] = None
+        self._menu: Optional[QMenu] = None
 
         # 主窗口
         self.main_window = None
@@ -57,61 +87,63 @@ class TrayApp:
 
         self.logger.info("托盘应用初始化完成")
 
-    def create_icon(self) -> pystray.Icon:
+    def create_icon(self) -> QSystemTrayIcon:
         """创建托盘图标
 
         Returns:
-            pystray.Icon: 托盘图标对象
+            QSystemTrayIcon: 托盘图标对象
         """
-        # 创建图标图片
-        icon_image = self._create_icon_image()
+        app = QApplication.instance()
 
         # 创建菜单
-        menu = pystray.Menu(
-            pystray.MenuItem("显示主界面", self._on_show_main_window),
-            pystray.Menu.SEPARATOR,
-            pystray.MenuItem("添加配置...", self._on_add_config),
-            pystray.Menu.SEPARATOR,
-            pystray.MenuItem("启动所有实例", self._on_start_all),
-            pystray.MenuItem("停止所有实例", self._on_stop_all),
-            pystray.Menu.SEPARATOR,
-            pystray.MenuItem("打开配置文件夹", self._on_open_config_folder),
-            pystray.MenuItem("退出", self._on_exit)
-        )
+        menu = QMenu()
+        self._add_menu_action(menu, "显示主界面", self._on_show_main_window)
+        menu.addSeparator()
+        self._add_menu_action(menu, "添加配置...", self._on_add_config)
+        menu.addSeparator()
+        self._add_menu_action(menu, "启动所有实例", self._on_start_all)
+        self._add_menu_action(menu, "停止所有实例", self._on_stop_all)
+        menu.addSeparator()
+        self._add_menu_action(menu, "打开配置文件夹", self._on_open_config_folder)
+        self._add_menu_action(menu, "退出", self._on_exit)
 
         # 创建图标
-        icon = pystray.Icon(
-            "Screen Streamer",
-            icon_image,
-            "Screen Streamer - 0 instances running",
-            menu
-        )
+        icon = QSystemTrayIcon(self._create_icon_image(), app)
+        icon.setToolTip("Screen Streamer - 0 instances running")
+        icon.setContextMenu(menu)
+        icon.activated.connect(self._on_icon_activated)
+
+        # 菜单需保持引用，避免被回收
+        self._menu = menu
 
         return icon
 
-    def _create_icon_image(self, size: int = 64) -> Image.Image:
-        """创建图标图片
+    def _add_menu_action(self, menu: "QMenu", text: str, handler) -> "QAction":
+        """添加菜单项
 
         Args:
-            size: 图标大小
+            menu: 菜单
+            text: 菜单项文字
+            handler: 点击处理函数（无参数）
 
         Returns:
-            Image.Image: 图标图片
+            QAction: 菜单项
         """
-        # 创建一个简单的绿色圆形图标
-        image = Image.new('RGB', (size, size), color=(255, 255, 255))
-        draw = ImageDraw.Draw(image)
+        action = QAction(text, menu)
+        action.triggered.connect(lambda checked=False: handler())
+        menu.addAction(action)
+        return action
 
-        # 绘制圆形
-        margin = 4
-        draw.ellipse(
-            [(margin, margin), (size - margin, size - margin)],
-            fill=(33, 150, 243),  # Material Blue
-            outline=(255, 255, 255),
-            width=2
-        )
+    def _create_icon_image(self, size: int = 64) -> "QIcon":
+        """创建图标图片
 
-        return image
+        Args:
+            size: 图标大小
+
+        Returns:
+            QIcon: 图标
+        """
+        return _get_icon_image(size)
 
     def update_tooltip(self) -> None:
         """更新托盘图标提示"""
@@ -120,42 +152,53 @@ class TrayApp:
 
         statuses = self.instance_manager.get_all_statuses()
 
-        running = sum(1 for s in statuses.values() if s.value == "running")
-        stopped = sum(1 for s in statuses.values() if s.value == "stopped")
-        errors = sum(1 for s in statuses.values() if s.value == "error")
+        # 一次遍历统计各状态数量
+        counts = Counter(s.value for s in statuses.values())
+        running = counts["running"]
+        stopped = counts["stopped"]
+        errors = counts["error"]
 
         tooltip = f"Screen Streamer - {running} running, {stopped} stopped"
 
         if errors > 0:
             tooltip += f", {errors} errors"
 
-        self.icon.tooltip = tooltip
+        self.icon.setToolTip(tooltip)
 
     def run(self) -> None:
-        """运行托盘应用（阻塞）"""
+        """显示托盘图标（非阻塞，由 Qt 事件循环驱动）"""
         self.logger.info("启动托盘应用")
 
         # 创建图标
         self.icon = self.create_icon()
+        self.icon.show()
 
         # 设置运行状态
         self._running = True
 
-        # 运行（阻塞）
-        self.icon.run()
-
-        self._running = False
-        self.logger.info("托盘应用已停止")
-
     def stop(self) -> None:
         """停止托盘应用"""
         self.logger.info("停止托盘应用")
 
         if self.icon:
-            self.icon.stop()
+            self.icon.hide()
 
         self._running = False
 
+    def _on_icon_activated(self, reason) -> None:
+        """托盘图标激活处理（双击显示/隐藏主窗口）
+
+        Args:
+            reason: 激活原因
+        """
+        if reason != QSystemTrayIcon.DoubleClick:
+            return
+
+        if self.main_window is not None and self.main_window.isVisible():
+            self.main_window.hide()
+        else:
+            self._show_main_window()
+
     def _on_show_main_window(self) -> None:
         """显示主窗口菜单项处理"""
         self.logger.info("显示主窗口")
@@ -278,3 +321,6 @@ class TrayApp:
 
         # 停止托盘应用
         self.stop()
+
+        # 退出 Qt 事件循环
+        QApplication.quit()
@@ -6,12 +6,22 @@
 
 import sys
 import logging
+from logging.handlers import MemoryHandler, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
 from src.config.config_parser import ConfigData
 
 
+# 单个日志文件的最大字节数与保留的历史文件数量
+_LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+_LOG_FILE_BACKUP_COUNT = 5
+
+# 文件日志批量写入：缓存的记录条数，以及立即写入的最低级别
+_LOG_BUFFER_CAPACITY = 256
+_LOG_FLUSH_LEVEL = logging.WARNING
+
+
 def setup_logger(config: ConfigData) -> logging.Logger:
     """配置日志记录器
 
@@ -25,7 +35,12 @@ def setup_logger(config: ConfigData) -> logging.Logger:
     logger = logging.getLogger("ScreenStreamer")
     logger.setLevel(getattr(logging, config.log_level))
 
-    # 清除现有的处理器
+    # 清除现有的处理器（先关闭，写出缓存中尚未写入文件的记录）
+    for handler in logger.handlers:
+        target = getattr(handler, "target", None)
+        handler.close()
+        if target is not None:
+            target.close()
     logger.handlers.clear()
 
     # 创建格式化器
@@ -47,14 +62,25 @@ def setup_logger(config: ConfigData) -> logging.Logger:
         # 确保日志文件目录存在
         log_file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        file_handler = logging.FileHandler(
+        # 按大小轮转，首条记录写入时才打开文件
+        file_handler = RotatingFileHandler(
             log_file_path,
             mode='a',
-            encoding='utf-8'
+            maxBytes=_LOG_FILE_MAX_BYTES,
+            backupCount=_LOG_FILE_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
         )
-        file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+
+        # 批量写入文件，WARNING 及以上级别的记录立即写出（进程退出时 logging 会写出剩余记录）
+        buffered_handler = MemoryHandler(
+            capacity=_LOG_BUFFER_CAPACITY,
+            flushLevel=_LOG_FLUSH_LEVEL,
+            target=file_handler
+        )
+        buffered_handler.setLevel(logging.DEBUG)
+        logger.addHandler(buffered_handler)
 
         logger.info(f"日志文件: {log_file_path.absolute()}")
 
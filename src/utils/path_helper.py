@@ -4,12 +4,16 @@
 提供路径相关的辅助函数
 """
 
+import functools
 from pathlib import Path
 
 
+@functools.lru_cache(maxsize=1)
 def get_builtin_ffmpeg_path() -> Path:
     """获取内置 FFmpeg 可执行文件路径
 
+    找到后缓存结果（运行期间路径不变）；未找到时抛出异常，不缓存，下次调用重新检查
+
     Returns:
         Path: FFmpeg 可执行文件的绝对路径
 